@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Dict, List, Tuple
+import duckdb
+import numpy as np
+import pyarrow.parquet as pq
+from synthetic_data.DataGenClasses import ComprehensiveEncounterDataClass, ComprehensiveEncounterMapDataClass
+from synthetic_data.parquet_gen import DEFAULT_ROW_GROUP_SIZE, generate_batches, write_parquet
+
+'''
+Measures how much of inter_ce_fact a facility or admit date filter has to scan, with the table in
+the order the join emits it and clustered on its cluster keys (meta.cluster_by).
+
+    python -m duck_dbt.cluster_benchmark --encounters 1000000 --output cluster_benchmark.json
+
+The extracts are generated, joined as in inter_ce_fact.sql and written both ways, as a duckdb table
+and as a parquet file. For each filter it reports how many parquet row groups have min/max
+statistics the filter can match, which is what a reader has to decompress, and the median query
+time on the parquet file and on the duckdb table, whose zone maps prune row groups the same way.
+'''
+
+DEFAULT_CLUSTER_BY = ("facility_id", "admit_date")
+
+FACT_QUERY = """
+SELECT
+    ce.id as id,
+    ce.facility_id as facility_id,
+    ce.created_on as created_on,
+    ce.deleted_on as deleted_on,
+    ce.admit_date as admit_date,
+    ce.discharge_date as discharge_date,
+    ce.type as type,
+    ce.patient_id as patient_id,
+    cevm.id as cevm_id,
+    cevm.comprehensive_encounter_id as comprehensive_encounter_id,
+    cevm.patient_visit_id as patient_visit_id,
+    cevm.deleted_on as cevm_deleted_on,
+    cevm.created_on as cevm_created_on,
+    cevm.patient_id as cevm_patient_id,
+    cevm.is_sensitive as is_sensitive
+FROM read_parquet('{comprehensive_encounter}') ce
+    LEFT JOIN read_parquet('{ce_visit_map}') cevm
+        ON ce.id = cevm.comprehensive_encounter_id
+"""
+
+
+def write_extracts(output_dir:str, encounters:int, facilities:int, days:int, seed:int=0) -> Dict[str, str]:
+    """
+    Writes comprehensive_encounter and ce_visit_map parquet files, with encounters spread evenly
+    over `facilities` and admitted over the `days` days up to today. Returns table -> path.
+    """
+    # One child seed per use, so the tables never draw the same values, e.g. repeating each other's ids
+    layout_seed, encounter_seed, visit_map_seed = (
+        int(child.generate_state(1, np.uint64)[0]) for child in np.random.SeedSequence(seed).spawn(3)
+    )
+    rng = np.random.default_rng(layout_seed)
+    facility_ids = rng.integers(0, facilities, size=encounters)
+    admit_dates = np.datetime64(date.today(), "D") - rng.integers(0, days, size=encounters)
+    paths = {name: os.path.join(output_dir, f"{name}.parquet") for name in ("comprehensive_encounter", "ce_visit_map")}
+    write_parquet(
+        generate_batches(ComprehensiveEncounterDataClass, encounters, seed=encounter_seed, facility_id=facility_ids, admit_date=admit_dates),
+        paths["comprehensive_encounter"],
+    )
+    encounter_ids = pq.read_table(paths["comprehensive_encounter"], columns=["id"]).column("id").to_numpy()
+    ce_ids = np.repeat(encounter_ids, 3)
+    write_parquet(
+        generate_batches(ComprehensiveEncounterMapDataClass, len(ce_ids), seed=visit_map_seed, comprehensive_encounter_id=ce_ids),
+        paths["ce_visit_map"],
+    )
+    return paths
+
+
+def _filters(facility_id:int, start:date, days:int) -> Dict[str, Dict[str, Tuple]]:
+    """Filter name -> {column: (low, high)}, both inclusive."""
+    date_range = (start, start + timedelta(days=days - 1))
+    return {
+        "facility": {"facility_id": (facility_id, facility_id)},
+        f"admit_date {days}d": {"admit_date": date_range},
+        f"facility + admit_date {days}d": {"facility_id": (facility_id, facility_id), "admit_date": date_range},
+    }
+
+
+def _where(bounds:Dict[str, Tuple]) -> str:
+    return " AND ".join(f"{column} BETWEEN '{low}' AND '{high}'" for column, (low, high) in bounds.items())
+
+
+def row_groups_matching(path:str, bounds:Dict[str, Tuple]) -> Tuple[int, int]:
+    """Row groups whose min/max statistics overlap every column's bounds, and the total."""
+    metadata = pq.ParquetFile(path).metadata
+    columns = {metadata.schema.column(i).name: i for i in range(metadata.num_columns)}
+    matching = 0
+    for row_group_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(row_group_index)
+        for column, (low, high) in bounds.items():
+            statistics = row_group.column(columns[column]).statistics
+            if statistics is not None and statistics.has_min_max and (statistics.max < low or statistics.min > high):
+                break
+        else:
+            matching += 1
+    return matching, metadata.num_row_groups
+
+
+def _median_seconds(con:duckdb.DuckDBPyConnection, query:str, repeat:int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        con.execute(query).fetchall()
+        times.append(perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmark(
+        encounters:int,
+        facilities:int=100,
+        days:int=365,
+        range_days:int=7,
+        cluster_by:List[str]=list(DEFAULT_CLUSTER_BY),
+        row_group_size:int=DEFAULT_ROW_GROUP_SIZE,
+        repeat:int=5,
+    ) -> List[dict]:
+    """Runs every filter against both layouts and prints one line per case."""
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        extracts = write_extracts(output_dir, encounters, facilities, days)
+        con = duckdb.connect(os.path.join(output_dir, "benchmark.duckdb"))
+        fact_query = FACT_QUERY.format(**extracts)
+        layouts = {"join order": fact_query, "clustered": f"{fact_query} ORDER BY {', '.join(cluster_by)}"}
+        for layout, query in layouts.items():
+            table = layout.replace(" ", "_")
+            con.execute(f"CREATE TABLE {table} AS {query}")
+            con.execute(f"COPY {table} TO '{os.path.join(output_dir, table)}.parquet' (FORMAT PARQUET, ROW_GROUP_SIZE {row_group_size})")
+        # The checkpoint writes the tables' row groups and zone maps to disk like a dbt build
+        con.execute("CHECKPOINT")
+
+        start = date.today() - timedelta(days=days // 2)
+        for filter_name, bounds in _filters(facilities // 2, start, range_days).items():
+            for layout in layouts:
+                table = layout.replace(" ", "_")
+                parquet_path = f"{os.path.join(output_dir, table)}.parquet"
+                matching, total = row_groups_matching(parquet_path, bounds)
+                select = f"SELECT count(patient_visit_id) FROM {{}} WHERE {_where(bounds)}"
+                result = {
+                    "filter": filter_name,
+                    "layout": layout,
+                    "row_groups_matching": matching,
+                    "row_groups": total,
+                    "parquet_seconds": _median_seconds(con, select.format(f"read_parquet('{parquet_path}')"), repeat),
+                    "table_seconds": _median_seconds(con, select.format(table), repeat),
+                }
+                results.append(result)
+                print(
+                    f"{filter_name:<26} {layout:<10} {matching:>6,} / {total:<6,} row groups ({matching / total:>6.1%})  "
+                    f"parquet {result['parquet_seconds'] * 1000:>8.1f} ms  table {result['table_seconds'] * 1000:>8.1f} ms"
+                )
+        con.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark facility and admit date scans of inter_ce_fact by layout.")
+    parser.add_argument("--encounters", type=int, default=1_000_000, help="each gets 3 visit maps")
+    parser.add_argument("--facilities", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365, help="admit dates are spread over this many days")
+    parser.add_argument("--range-days", type=int, default=7, help="length of the admit date range filter")
+    parser.add_argument("--cluster-by", nargs="+", default=list(DEFAULT_CLUSTER_BY))
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query, the median is kept")
+    parser.add_argument("--output", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.encounters, args.facilities, args.days, args.range_days, args.cluster_by, args.row_group_size, args.repeat
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
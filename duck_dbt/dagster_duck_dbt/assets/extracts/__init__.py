@@ -1,38 +1,66 @@
-from dagster import asset
-import pandas as pd
+from datetime import date
+from dagster import Output, StaticPartitionsDefinition, asset
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from synthetic_data.DataGenClasses import FacilityDataClass, ComprehensiveEncounterDataClass, ComprehensiveEncounterMapDataClass
+from synthetic_data.parquet_gen import DEFAULT_ROW_GROUP_SIZE, batch_seed, generate_batches
 
+FACILITY_COUNT = 100
+ENCOUNTERS_PER_FACILITY = 100
+VISIT_MAPS_PER_ENCOUNTER = 3
 
-@asset
-def facility() -> pd.DataFrame:
+# Extracts are split into buckets of facilities (facility id % FACILITY_BUCKETS) so each bucket
+# can be materialized as its own run, in parallel with the others
+FACILITY_BUCKETS = 8
+facility_bucket_partitions = StaticPartitionsDefinition([str(bucket) for bucket in range(FACILITY_BUCKETS)])
+# Name of the Hive partition directory, and so of the bucket column in the duckdb views
+FACILITY_BUCKET_METADATA = {"partition_column": "facility_bucket"}
+
+# Each bucket is seeded from this and its bucket number, and its dates are drawn relative to
+# EXTRACT_AS_OF rather than today, so regenerating an unchanged bucket produces the same content
+# and the IO manager can skip replacing it. comprehensive_encounter and ce_visit_map are streamed,
+# so they are still generated and written to a temporary file before their hash is compared
+EXTRACT_SEED = 0
+# Dates fall in the 30 days before this, the first month of the dbt day partitions
+EXTRACT_AS_OF = date(2023, 2, 1)
+# Every asset draws from its own stream of the bucket's seed, so e.g. ce_visit_map ids do not
+# repeat comprehensive_encounter ids
+FACILITY_STREAM, COMPREHENSIVE_ENCOUNTER_STREAM, CE_VISIT_MAP_STREAM = range(3)
+
+
+def _asset_seed(context, stream:int) -> int:
+    return int(np.random.SeedSequence([EXTRACT_SEED, int(context.partition_key), stream]).generate_state(1, np.uint64)[0])
+
+
+@asset(partitions_def=facility_bucket_partitions, metadata=FACILITY_BUCKET_METADATA)
+def facility(context) -> pa.Table:
     """A table containing all facility information"""
-    facility_list = []
-    for facility_id in range(100):
-        facility = FacilityDataClass(id=facility_id)
-        facility_list.append(facility.__dict__)
-    return pd.DataFrame.from_records(facility_list)
+    facility_ids = np.arange(int(context.partition_key), FACILITY_COUNT, FACILITY_BUCKETS)
+    return FacilityDataClass.generate(len(facility_ids), seed=_asset_seed(context, FACILITY_STREAM), as_of=EXTRACT_AS_OF, id=facility_ids)
 
 
-@asset
-def comprehensive_encounter(facility:pd.DataFrame) -> pd.DataFrame:
+@asset(partitions_def=facility_bucket_partitions, metadata=FACILITY_BUCKET_METADATA)
+def comprehensive_encounter(context, facility:str):
     """A table containing all comprehensive encounter information"""
-    ce_list = []
-    for f_id in facility['id'].to_list():
-        for ce_id in range(100):
-            ce = ComprehensiveEncounterDataClass(
-                facility_id=f_id
-            )
-            ce_list.append(ce.__dict__)
-    return pd.DataFrame.from_records(ce_list)
-
-@asset
-def ce_visit_map(comprehensive_encounter:pd.DataFrame) -> pd.DataFrame:
+    # Only the ids are needed, so read them from the bucket's file instead of loading the DataFrame
+    facility_ids = np.repeat(pq.read_table(facility, columns=["id"]).column("id").to_numpy(), ENCOUNTERS_PER_FACILITY)
+    # Wrapped in Output so dagster hands the batch generator to the IO manager instead of iterating it
+    return Output(generate_batches(ComprehensiveEncounterDataClass, len(facility_ids), seed=_asset_seed(context, COMPREHENSIVE_ENCOUNTER_STREAM), as_of=EXTRACT_AS_OF, facility_id=facility_ids))
+
+@asset(partitions_def=facility_bucket_partitions, metadata=FACILITY_BUCKET_METADATA)
+def ce_visit_map(context, comprehensive_encounter:str):
     """A table containinng mappings from comprehensive encounters to patient visits"""
-    ce_vm_list = []
-    for ce_id in comprehensive_encounter['id'].to_list():
-        for i in range(3):
-            cevm = ComprehensiveEncounterMapDataClass(
-                comprehensive_encounter_id=ce_id
-            )
-            ce_vm_list.append(cevm.__dict__)
-    return pd.DataFrame.from_records(ce_vm_list)
\ No newline at end of file
+    return Output(_visit_map_batches(comprehensive_encounter, _asset_seed(context, CE_VISIT_MAP_STREAM)))
+
+def _visit_map_batches(comprehensive_encounter_path:str, seed:int):
+    # Read the encounter ids a batch at a time instead of loading the whole extract. A dataset
+    # rather than a ParquetFile, so the path can also be a directory of appended part files
+    id_batches = ds.dataset(comprehensive_encounter_path, format="parquet").to_batches(
+        batch_size=DEFAULT_ROW_GROUP_SIZE // VISIT_MAPS_PER_ENCOUNTER,
+        columns=["id"],
+    )
+    for batch_index, id_batch in enumerate(id_batches):
+        ce_ids = np.repeat(id_batch.column("id").to_numpy(zero_copy_only=False), VISIT_MAPS_PER_ENCOUNTER)
+        yield ComprehensiveEncounterMapDataClass.generate(len(ce_ids), seed=batch_seed(seed, batch_index), as_of=EXTRACT_AS_OF, comprehensive_encounter_id=ce_ids)
@@ -1,9 +1,15 @@
 import os
 from dagster import (
-    ScheduleDefinition,
+    AllPartitionMapping,
+    AssetSelection,
+    AssetsDefinition,
+    DailyPartitionsDefinition,
+    PartitionMapping,
+    build_schedule_from_partitioned_job,
     define_asset_job,
     load_assets_from_package_module,
     repository,
+    schedule,
     with_resources
 )
 from dagster_dbt import load_assets_from_dbt_project, dbt_cli_resource
@@ -14,6 +20,17 @@ from duck_dbt.dagster_duck_dbt.resources import duckdb_parquet_io_manager
 
 DBT_PROJECT_DIR = os.path.join(os.path.dirname(__file__), "../dbt_project")
 DBT_PROFILES_DIR = os.path.join(os.path.dirname(__file__), "../dbt_project/config")
+PARQUET_BASE_PATH = "/Users/carlss/repos/.sandbox/data"
+# dbt reads the extract parquet files directly and exports its models itself, instead of reading
+# the io manager's duckdb views and having the io manager COPY each model out of the warehouse
+DBT_PARQUET_NATIVE = True
+# dbt builds independent models on DBT_THREADS threads sharing one duckdb instance, which spills to
+# temp_directory past memory_limit. A run can override them with the dbt op's `threads` and `vars` config
+DBT_THREADS = 4
+DUCKDB_SETTINGS = {
+    "memory_limit": "4GB",
+    "temp_directory": os.path.join(DBT_PROJECT_DIR, "target", "duckdb_tmp"),
+}
 
 extract_assets = load_assets_from_package_module(
     extracts,
@@ -22,15 +39,74 @@ extract_assets = load_assets_from_package_module(
     key_prefix=["duckdb", "extracts"]
 )
 
-dbt_assets = load_assets_from_dbt_project(
-    DBT_PROJECT_DIR,
-    DBT_PROFILES_DIR,
-    key_prefix=["duckdb", "dbt_schema"],
-    source_key_prefix=["duckdb"]
-)
+# Incremental dbt models are built one day of changes at a time, see the changed_in_window macro
+dbt_partitions = DailyPartitionsDefinition(start_date="2023-01-01")
+
+def dbt_run_vars(partition_key: str) -> dict:
+    window = dbt_partitions.time_window_for_partition_key(partition_key)
+    return {
+        "window_start": window.start.strftime("%Y-%m-%d"),
+        "window_end": window.end.strftime("%Y-%m-%d"),
+        "parquet_native": DBT_PARQUET_NATIVE,
+        "extracts_path": PARQUET_BASE_PATH,
+        "export_path": PARQUET_BASE_PATH,
+        **DUCKDB_SETTINGS,
+    }
+
+def with_partition_mapping(assets_def: AssetsDefinition, upstream_keys: set, partition_mapping: PartitionMapping) -> AssetsDefinition:
+    """
+    `assets_def` with `partition_mapping` on its dependencies on `upstream_keys`. dagster-dbt has
+    no way to pass partition mappings, so the loaded definition is rebuilt with them.
+    """
+    return AssetsDefinition(
+        keys_by_input_name=assets_def.node_keys_by_input_name,
+        keys_by_output_name=assets_def.node_keys_by_output_name,
+        node_def=assets_def.node_def,
+        partitions_def=assets_def.partitions_def,
+        partition_mappings={
+            **assets_def.partition_mappings,
+            **{key: partition_mapping for key in assets_def.node_keys_by_input_name.values() if key in upstream_keys},
+        },
+        asset_deps=assets_def.asset_deps,
+        selected_asset_keys=assets_def.keys,
+        can_subset=assets_def.can_subset,
+        resource_defs=assets_def.resource_defs,
+        group_names_by_key=assets_def.group_names_by_key,
+        metadata_by_key=assets_def.metadata_by_key,
+        freshness_policies_by_key=assets_def.freshness_policies_by_key,
+    )
 
+# Every day partition of the dbt models reads every facility bucket of the extracts
+extract_keys = {key for assets_def in extract_assets for key in assets_def.keys}
+dbt_assets = [
+    with_partition_mapping(assets_def, extract_keys, AllPartitionMapping())
+    for assets_def in load_assets_from_dbt_project(
+        DBT_PROJECT_DIR,
+        DBT_PROFILES_DIR,
+        key_prefix=["duckdb", "dbt_schema"],
+        source_key_prefix=["duckdb"],
+        partitions_def=dbt_partitions,
+        partition_key_to_vars_fn=dbt_run_vars,
+    )
+]
+
+
+# One run per facility bucket, so buckets are generated in parallel by the run coordinator
+extract_job = define_asset_job(
+    "extract_job",
+    selection=AssetSelection.groups("extracts"),
+    partitions_def=extracts.facility_bucket_partitions,
+)
+daily_job = define_asset_job(
+    "daily_job",
+    selection=AssetSelection.all() - AssetSelection.groups("extracts"),
+    partitions_def=dbt_partitions,
+)
 
-daily_job = define_asset_job("daily_job", selection="*")
+@schedule(job=extract_job, cron_schedule="@daily")
+def daily_extract_schedule(context):
+    for partition_key in extracts.facility_bucket_partitions.get_partition_keys():
+        yield extract_job.run_request_for_partition(partition_key=partition_key, run_key=partition_key)
 
 @repository
 def dagster_duck_dbt():
@@ -40,10 +116,15 @@ def dagster_duck_dbt():
         extract_assets + dbt_assets,
         resource_defs={
             "io_manager": duckdb_io_manager.configured(
-                {"duckdb_path": os.path.join(DBT_PROJECT_DIR, "warehouse.duckdb")}
+                {
+                    "base_path": PARQUET_BASE_PATH,
+                    "duckdb_path": os.path.join(DBT_PROJECT_DIR, "warehouse.duckdb"),
+                    "write_options": {"compression": "zstd"},
+                    "export_tables": not DBT_PARQUET_NATIVE,
+                }
             ),
             "dbt": dbt_cli_resource.configured(
-                {"project_dir": DBT_PROJECT_DIR, "profiles_dir": DBT_PROFILES_DIR}
+                {"project_dir": DBT_PROJECT_DIR, "profiles_dir": DBT_PROFILES_DIR, "threads": DBT_THREADS}
             ),
         },
-    ) + [ScheduleDefinition(job=daily_job, cron_schedule="@daily"),]
\ No newline at end of file
+    ) + [daily_extract_schedule, build_schedule_from_partitioned_job(daily_job, hour_of_day=1)]
\ No newline at end of file
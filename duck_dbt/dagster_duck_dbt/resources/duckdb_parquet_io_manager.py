@@ -1,55 +1,316 @@
+import fcntl
+import glob
 import os
-from typing import Union
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Union
 import duckdb
 import pandas as pd
+import pyarrow as pa
 from dagster import Field, PartitionKeyRange, _check as check, io_manager, IOManager, OutputContext, InputContext
 from dagster._seven.temp_dir import get_system_temp_directory
-from .parquet_io_manager import ParquetIOManager
+from .parquet_io_manager import (
+    COMPACTION_SCHEMA,
+    SKIP_UNCHANGED_SCHEMA,
+    WRITE_OPTIONS_SCHEMA,
+    ContentHasher,
+    ParquetIOManager,
+    atomic_write,
+)
+
+
+class _ReadPool():
+    """A long lived in-memory duckdb connection handing out up to `size` cursors to concurrent loads."""
+
+    def __init__(self, size: int) -> None:
+        self._con = duckdb.connect(database=":memory:")
+        self._cursors = queue.Queue()
+        for _ in range(size):
+            self._cursors.put(self._con.cursor())
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        cursor = self._cursors.get()
+        try:
+            yield cursor
+        finally:
+            self._cursors.put(cursor)
+
+
+# One read pool per process and pool size. Keyed by pid too, as a connection must not cross a fork
+_READ_POOLS: Dict[tuple, _ReadPool] = {}
+_READ_POOLS_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
+
+
+def _lazy_relation(query: str) -> duckdb.DuckDBPyRelation:
+    """
+    A lazy relation on an in-memory connection of its own, since it outlives the load that creates
+    it. Nothing else holds the connection, so it is closed along with the last relation derived from
+    it instead of piling up as a cursor of a read pool's connection.
+    """
+    return duckdb.connect(database=":memory:").query(query)
 
 
 class DuckDBParquetIOManager(ParquetIOManager):
-    """Stores data in parquet files and created duckdb views over those files."""
+    """
+    Stores data in parquet files and created duckdb views over those files.
+
+    Besides the ParquetIOManager types, outputs can be duckdb relations, which are fetched as Arrow
+    and written by pyarrow, and inputs can be loaded as pyarrow Tables straight from duckdb's Arrow
+    result instead of through a DataFrame.
+
+    Inputs annotated as `duckdb.DuckDBPyRelation` are lazy: nothing is read until the asset fetches
+    a result, and the projections, filters and aggregates it applies are pushed down into the
+    parquet scan, e.g. `comprehensive_encounter.filter("type = 'EMERGENCY'").aggregate("count(*)")`.
+
+    duckdb lets only one process at a time open the warehouse file for writing, so the two sides
+    are kept apart:
+
+    - Loads scan the asset's parquet files from a long lived in-memory connection per process,
+      through a pool of `read_pool_size` cursors. Relation inputs, which outlive the load, get an
+      in-memory connection of their own instead. Only a warehouse table with no parquet export
+      is read from the warehouse itself, opened read-only.
+    - Writes (view DDL and COPY exports) queue on an exclusive lock on `{duckdb_path}.lock`, so
+      step processes of the multiprocess executor wait their turn instead of failing on duckdb's
+      file lock, and each writer holds the file only for its turn. Read-only checks of the
+      warehouse share the lock with each other and only wait for writers.
+
+    Outputs skipped as unchanged (see ParquetIOManager) keep their file and their view. The
+    warehouse is only checked read-only for the view, and locked for writing just to create it
+    again when it was dropped or the warehouse is new. Exports of dbt tables are hashed from the
+    warehouse before the COPY, and an unchanged table is not exported.
+
+    Views over appended assets glob every part file, so new parts and compacted ones are picked up
+    without recreating the view. dbt table exports are always written whole, to
+    `{base_path}/{table}.parquet` even when the model is partitioned, and loads of any partition
+    of a dbt asset read the whole export.
+
+    With `export_tables` off, dbt tables are left in the warehouse, for when dbt exports its models
+    itself (see the dbt project's parquet_native var). Loads then read dbt's export, either
+    `{base_path}/{table}.parquet` or a Hive partitioned `{base_path}/{table}/` directory, or the
+    warehouse table when the model isn't exported.
+    """
 
-    def handle_output(self, context: OutputContext, obj: Union[pd.DataFrame, None]) -> None:
+    def __init__(
+            self,
+            base_path: str,
+            duckdb_path: str,
+            read_pool_size: int = 4,
+            write_options: Optional[Dict[str, Any]] = None,
+            skip_unchanged: bool = True,
+            compaction: Optional[Dict[str, int]] = None,
+            export_tables: bool = True,
+        ) -> None:
+        super().__init__(base_path, write_options, skip_unchanged, compaction)
+        self._duckdb_path = duckdb_path
+        self._read_pool_size = read_pool_size
+        self._export_tables = export_tables
+
+    def handle_output(self, context: OutputContext, obj: Union[pd.DataFrame, pa.Table, duckdb.DuckDBPyRelation, None]) -> None:
         if obj is not None:
-            super().handle_output(context, obj)
-            con = self._connect_duckdb(context)
-            path = self._get_path(context)
-            if context.has_asset_partitions:
-                to_scan = os.path.join(os.path.dirname(path), "*.parquet")
-            else:
-                to_scan = path
-            con.execute(f"CREATE SCHEMA IF NOT EXISTS {self._schema(context)};")
-            con.execute(f"CREATE OR REPLACE VIEW {self._table_path(context)} as ( SELECT * FROM parquet_scan('{to_scan}'));")
-        else:
-            con = self._connect_duckdb(context)
-            path = self._get_path(context)
-            if context.has_asset_partitions:
-                start, end = context.asset_partitions_time_window()
-                con.execute(f"COPY (SELECT * FROM {self._table_path(context)}) TO '{path}.parquet' (FORMAT PARQUET)")
-            else:
-                con.execute(f"COPY {self._table_path(context)} TO '{path}' (FORMAT PARQUET)")
+            if isinstance(obj, duckdb.DuckDBPyRelation):
+                obj = obj.arrow()
+                # Newer duckdb versions return a RecordBatchReader from arrow()
+                if isinstance(obj, pa.RecordBatchReader):
+                    obj = obj.read_all()
+            written = self._write_output(context, obj)
+            if not glob.glob(self._files(context, self._get_path(context))):
+                # An empty stream appended nothing, and a view over no files fails to bind
+                return
+            if not written and self._view_exists(context):
+                # Skipped as unchanged with its view in place, so there's nothing to lock the warehouse for
+                return
+            # The file is already renamed into place, so the view never points at a partial file.
+            # A skipped output only gets its view back if it was dropped or the warehouse is new
+            create_view = "CREATE OR REPLACE VIEW" if written else "CREATE VIEW IF NOT EXISTS"
+            with self._writer() as con:
+                con.execute(f"CREATE SCHEMA IF NOT EXISTS {self._schema(context)};")
+                con.execute(f"{create_view} {self._table_path(context)} as ( SELECT * FROM {self._scan(context)});")
+        elif self._export_tables:
+            if self._appends(context):
+                check.failed(f"{self._table_path(context)} is exported by COPY, which can't append. Remove its write_mode metadata.")
+            # The whole table is exported whichever window an incremental model was built for
+            path = os.path.join(self._base_path, f"{context.asset_key.path[-1]}.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_options = self._get_write_options(context)
+            order_by = f" ORDER BY {', '.join(write_options['sort_by'])}" if write_options.get("sort_by") else ""
+            copy_options = self._copy_options(context, write_options)
+            query = f"SELECT * FROM {self._table_path(context)}{order_by}"
+            with self._writer() as con:
+                content_hash = self._table_content_hash(con, query, write_options) if self._skip_unchanged else None
+                if content_hash and content_hash == self._previous_content_hash(path):
+                    self._unchanged(context, path, con.execute(f"SELECT count(*) FROM ({query})").fetchone()[0], content_hash)
+                    return
+                with atomic_write(path) as tmp_path:
+                    con.execute(f"COPY ({query}) TO '{tmp_path}' ({copy_options})")
+                    self._remove_content_hash(path)
+            if content_hash:
+                self._record_content_hash(path, content_hash)
+                context.add_output_metadata({"path": path, "content_hash": content_hash, "unchanged": False})
+
+    def _copy_options(self, context: OutputContext, write_options: Dict[str, Any]) -> str:
+        """`write_options` as COPY options. Those COPY has no equivalent for fail rather than being ignored."""
+        unsupported = [option for option in ("use_dictionary", "write_statistics") if not write_options.get(option, True)]
+        if unsupported:
+            check.failed(f"{self._table_path(context)} is exported by COPY, which can't turn off {' or '.join(unsupported)}.")
+        # COPY calls no compression "uncompressed"
+        compression = write_options.get("compression", "snappy")
+        copy_options = f"FORMAT PARQUET, COMPRESSION {'uncompressed' if compression == 'none' else compression}"
+        if write_options.get("compression_level") is not None:
+            copy_options += f", COMPRESSION_LEVEL {write_options['compression_level']}"
+        if write_options.get("row_group_size"):
+            copy_options += f", ROW_GROUP_SIZE {write_options['row_group_size']}"
+        return copy_options
+
+    def _table_content_hash(self, con: duckdb.DuckDBPyConnection, query: str, write_options: Dict[str, Any]) -> str:
+        """Hashes the query's result as ParquetIOManager hashes outputs, one Arrow batch at a time."""
+        hasher = ContentHasher(write_options)
+        for batch in con.execute(query).fetch_record_batch():
+            hasher.update(pa.Table.from_batches([batch]))
+        return hasher.hexdigest()
     
-    def load_input(self, context: InputContext) -> Union[pd.DataFrame, str]:
-        check.invariant(
-            not context.has_asset_partitions
-            or context.asset_partition_key_range == PartitionKeyRange(
-                context.asset_partitions_def.get_first_partition_key(),
-                context.asset_partitions_def.get_last_partition_key(),
-            ),
-            "Loading a subselection of partitions is not yet supported",
-        )       
+    def load_input(self, context: InputContext) -> Union[pd.DataFrame, pa.Table, duckdb.DuckDBPyRelation, str]:
+        if not glob.glob(self._scan_glob(context)):
+            # Nothing written here, so the asset is a warehouse table like a dbt model
+            return self._load_table(context)
+        if context.dagster_type.typing_type == str:
+            # A path needs no view, so it works for a single partition of a partitioned asset
+            return self._get_path(context)
         if context.dagster_type.typing_type == pd.DataFrame:
-            con = self._connect_duckdb(context)
-            return con.execute(f"SELECT * FROM {self._table_path(context)}").fetch_df()
+            with self._reader() as cursor:
+                return cursor.execute(f"SELECT * FROM {self._input_relation(context)}").fetch_df()
+        if context.dagster_type.typing_type == pa.Table:
+            with self._reader() as cursor:
+                return cursor.execute(f"SELECT * FROM {self._input_relation(context)}").fetch_arrow_table()
+        if context.dagster_type.typing_type == duckdb.DuckDBPyRelation:
+            return _lazy_relation(f"SELECT * FROM {self._input_relation(context)}")
 
         check.failed(
             f"Inputs of type {context.dagster_type} not supported. Please specify a valid type" 
             "for this input either on the argument of the @asset-decorated function."
         )
 
-    def _connect_duckdb(self, context: Union[OutputContext, InputContext]) -> duckdb.DuckDBPyConnection:
-        return duckdb.connect(database=context.resource_config["duckdb_path"], read_only=False)
+    def _load_table(self, context: InputContext) -> Union[pd.DataFrame, pa.Table, duckdb.DuckDBPyRelation, str]:
+        """
+        Loads a warehouse table from its parquet export, whole whichever partitions are loaded, or
+        when it has none, e.g. a dbt model with export_tables off, from the warehouse opened read-only.
+        """
+        typing_type = context.dagster_type.typing_type
+        export = self._table_export(context)
+        if export is not None:
+            if typing_type == str:
+                return export
+            if os.path.isdir(export):
+                query = f"SELECT * FROM parquet_scan('{os.path.join(export, '**', '*.parquet')}', hive_partitioning=true)"
+            else:
+                query = f"SELECT * FROM parquet_scan('{export}')"
+            if typing_type == duckdb.DuckDBPyRelation:
+                return _lazy_relation(query)
+            with self._reader() as cursor:
+                result = cursor.execute(query)
+                return result.fetch_df() if typing_type == pd.DataFrame else result.fetch_arrow_table()
+        if typing_type not in (pd.DataFrame, pa.Table, duckdb.DuckDBPyRelation):
+            check.failed(f"{self._table_path(context)} has no parquet export, so it can only be loaded as a DataFrame, Table or relation.")
+        with self._warehouse_reader() as con:
+            table = con.execute(f"SELECT * FROM {self._table_path(context)}").fetch_arrow_table()
+        if typing_type == pd.DataFrame:
+            return table.to_pandas()
+        if typing_type == duckdb.DuckDBPyRelation:
+            return duckdb.connect(database=":memory:").from_arrow(table)
+        return table
+
+    def _table_export(self, context: Union[OutputContext, InputContext]) -> Optional[str]:
+        """
+        The parquet export of a warehouse table: `{base_path}/{table}.parquet` as COPY and dbt write
+        it, or the `{base_path}/{table}/` directory of Hive partitions dbt writes for a model with
+        `meta.partition_by`. None when the table hasn't been exported.
+        """
+        path = os.path.join(self._base_path, context.asset_key.path[-1])
+        if os.path.exists(f"{path}.parquet"):
+            return f"{path}.parquet"
+        if glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True):
+            return path
+        return None
+
+    def _read_pool(self) -> _ReadPool:
+        key = (os.getpid(), self._read_pool_size)
+        with _READ_POOLS_LOCK:
+            if key not in _READ_POOLS:
+                _READ_POOLS[key] = _ReadPool(self._read_pool_size)
+            return _READ_POOLS[key]
+
+    @contextmanager
+    def _reader(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        with self._read_pool().cursor() as cursor:
+            yield cursor
+
+    @contextmanager
+    def _writer(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """The warehouse opened for writing, once earlier writers from any thread or process are done."""
+        with _WRITE_LOCK, open(f"{self._duckdb_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                con = duckdb.connect(database=self._duckdb_path, read_only=False)
+                try:
+                    yield con
+                finally:
+                    con.close()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _warehouse_reader(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """The warehouse opened read-only, alongside other readers but never while a writer has it."""
+        with open(f"{self._duckdb_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                con = duckdb.connect(database=self._duckdb_path, read_only=True)
+                try:
+                    yield con
+                finally:
+                    con.close()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _view_exists(self, context: OutputContext) -> bool:
+        if not os.path.exists(self._duckdb_path):
+            return False
+        with self._warehouse_reader() as con:
+            return con.execute(
+                "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+                [self._schema(context), context.asset_key.path[-1]],
+            ).fetchone()[0] > 0
+
+    def _input_relation(self, context: InputContext) -> str:
+        """
+        A scan of the asset's files, or when only a range of its partitions is loaded, of just
+        those partitions' files so duckdb never opens the others.
+        """
+        if not context.has_asset_partitions or context.asset_partition_key_range == PartitionKeyRange(
+            context.asset_partitions_def.get_first_partition_key(),
+            context.asset_partitions_def.get_last_partition_key(),
+        ):
+            return self._scan(context)
+        files = ", ".join(f"'{self._files(context, self._get_partition_path(context, key))}'" for key in context.asset_partition_keys)
+        return f"parquet_scan([{files}], hive_partitioning=true)"
+
+    def _scan(self, context: Union[OutputContext, InputContext]) -> str:
+        """parquet_scan over every file of the asset, exposing partition directories as columns."""
+        if not context.has_asset_partitions:
+            return f"parquet_scan('{self._scan_glob(context)}')"
+        return f"parquet_scan('{self._scan_glob(context)}', hive_partitioning=true)"
+
+    def _scan_glob(self, context: Union[OutputContext, InputContext]) -> str:
+        """
+        Glob of every file written for the asset. Partition directories are matched by their column
+        name, so a dbt model's own Hive partitioned export in the same directory never matches.
+        """
+        if not context.has_asset_partitions:
+            return self._files(context, self._get_path(context))
+        partition_dirs = [f"{column}=*" for column in self._partition_columns(context)]
+        return os.path.join(self._base_path, context.asset_key.path[-1], *partition_dirs, "*.parquet")
 
     def _schema(self, context: Union[OutputContext, InputContext]) -> str:
         return f"{context.asset_key.path[-2]}"
@@ -59,9 +320,23 @@ class DuckDBParquetIOManager(ParquetIOManager):
 
 
 @io_manager(
-    config_schema={"base_path": Field(str, is_required=False), "duckdb_path": str},
+    config_schema={
+        "base_path": Field(str, is_required=False),
+        "duckdb_path": str,
+        "read_pool_size": Field(int, default_value=4, description="Cursors per process available to concurrent loads"),
+        "write_options": WRITE_OPTIONS_SCHEMA,
+        "skip_unchanged": SKIP_UNCHANGED_SCHEMA,
+        "compaction": COMPACTION_SCHEMA,
+        "export_tables": Field(bool, default_value=True, description="COPY dbt tables out of the warehouse to parquet"),
+    },
 )
 def duckdb_parquet_io_manager(init_context):
     return DuckDBParquetIOManager(
-        base_path=init_context.resource_config.get("base_path", "/Users/carlss/repos/.sandbox/data")
+        base_path=init_context.resource_config.get("base_path", "/Users/carlss/repos/.sandbox/data"),
+        duckdb_path=init_context.resource_config["duckdb_path"],
+        read_pool_size=init_context.resource_config["read_pool_size"],
+        write_options=init_context.resource_config.get("write_options"),
+        skip_unchanged=init_context.resource_config["skip_unchanged"],
+        compaction=init_context.resource_config.get("compaction"),
+        export_tables=init_context.resource_config["export_tables"],
     )
\ No newline at end of file
@@ -1,56 +1,417 @@
+import fcntl
+import glob
+import hashlib
+import json
 import os
-from typing import Union
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 import pandas as pd
-from dagster import Field, IOManager, InputContext, OutputContext, _check as check, io_manager
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dagster import (
+    Field,
+    IOManager,
+    InputContext,
+    MultiPartitionsDefinition,
+    OutputContext,
+    _check as check,
+    io_manager,
+)
 from dagster._seven.temp_dir import get_system_temp_directory
 
+# Separates the dimension values in a multi-dimensional partition key, e.g. "2023-01-01|facility_a"
+MULTIPARTITION_KEY_DELIMITER = "|"
+
+# Config for how parquet files are written, shared by the parquet IO managers. Any option can also
+# be overridden per asset with a `write_options` dict in the asset's metadata.
+WRITE_OPTIONS_SCHEMA = Field(
+    {
+        "compression": Field(str, default_value="snappy", description="snappy, zstd, gzip, brotli, lz4 or none"),
+        "compression_level": Field(int, is_required=False),
+        "row_group_size": Field(int, is_required=False, description="Maximum rows per row group"),
+        "use_dictionary": Field(bool, default_value=True),
+        "write_statistics": Field(bool, default_value=True, description="Row group min/max statistics"),
+        "sort_by": Field([str], is_required=False, description="Columns to sort Table outputs by so row group statistics can prune. Not for streamed outputs"),
+    },
+    is_required=False,
+)
+
+# When assets written with `write_mode: append` have their small part files merged
+COMPACTION_SCHEMA = Field(
+    {
+        "threshold": Field(int, default_value=16, description="Merge a directory's small part files once there are more than this many"),
+        "small_file_bytes": Field(int, default_value=128 * 2**20, description="Part files smaller than this are merged"),
+    },
+    is_required=False,
+)
+
+SKIP_UNCHANGED_SCHEMA = Field(
+    bool, default_value=True, description="Skip writing outputs whose content hash matches the file already written"
+)
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[str]:
+    """
+    Yields a temporary path in `path`'s directory to write to. Once written it is fsynced and
+    renamed over `path`, so readers see either the old file or the complete new one. On failure
+    the temporary file is removed and `path` is left untouched.
+    """
+    directory = os.path.dirname(path)
+    # Hidden and not *.parquet, so globs over the directory never pick up a half written file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        _fsync(tmp_path)
+        os.replace(tmp_path, path)
+        _fsync(directory)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ContentHasher():
+    """
+    sha256 of an output's content: the Arrow IPC stream of its batches, plus the write options it
+    is written with so a change of compression or sort order still rewrites the file.
+    """
+
+    def __init__(self, write_options: Dict[str, Any]) -> None:
+        self._sha256 = hashlib.sha256(json.dumps(write_options, sort_keys=True).encode())
+        self._schema = None
+        self._stream = None
+        self.closed = False
+
+    def write(self, data) -> int:
+        # pa.ipc writes the stream here, so the batches are hashed without being serialized to memory
+        self._sha256.update(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def update(self, batch: pa.Table) -> None:
+        if self._stream is None:
+            self._schema = batch.schema
+            self._stream = pa.ipc.new_stream(self, self._schema)
+        self._stream.write_table(batch.cast(self._schema))
+
+    def hashed(self, batches: Iterable[pa.Table]) -> Iterator[pa.Table]:
+        """Passes `batches` through, hashing each on the way."""
+        for batch in batches:
+            self.update(batch)
+            yield batch
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def _part_path(directory: str) -> str:
+    """A new part file in `directory`, named so parts sort in the order they were written."""
+    return os.path.join(directory, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+
+
+class _Unchanged(Exception):
+    """Raised inside atomic_write to drop the temporary file when the content matched the old file."""
+
+
+class _Empty(Exception):
+    """Raised inside atomic_write when a stream yields no batches, which leaves no schema to write."""
+
 
 class ParquetIOManager(IOManager):
     """
-    This IOManager will take in a pandas dataframe or dbt table and store it in parqeut at the specified path.
+    This IOManager will take in a pandas dataframe, pyarrow Table or dbt table and store it in parqeut at the specified path.
+    Everything is written through pyarrow.parquet, so Arrow outputs are written without a pandas round trip.
+
+    Outputs can also be an iterator of pyarrow Tables, which are streamed to the file one row group
+    per table so large extracts never have to be held in memory.
+
+    It stores outputs for different partitions in different filepaths, using Hive-style
+    `column=value/` directories so readers like duckdb's `hive_partitioning` can prune them:
+
+        {base_path}/{asset}/{column}={partition key}/data.parquet
 
-    It stores outputs for different partitions in different filepaths.
+    The column is named by the asset's `partition_column` metadata ("partition" by default), and
+    multi-dimensional partitions get one directory level per dimension, named after the dimension.
 
-    Downstream ops can either load this dataframe or simply retrieve a path to where the data is stored.
+    Compression, row group size, dictionary encoding, statistics and sort order come from the
+    `write_options` config, and an asset can override any of them in its metadata:
+
+        @asset(metadata={"write_options": {"compression": "zstd", "sort_by": ["facility_id"]}})
+
+    `sort_by` sorts a whole Table or DataFrame before it is written. A streamed output can't be
+    sorted without holding it in memory, and sorting each batch alone prunes nothing, so an output
+    streamed with `sort_by` fails; sort it upstream instead.
+
+    Files are written to a temporary file next to the target and renamed over it once complete, so
+    a failed or killed step never leaves a truncated file behind for downstream reads.
+
+    Each file's content hash is recorded in the output metadata and in a `{file}.sha256` file next
+    to it. With `skip_unchanged`, an output whose hash matches the file already there is not
+    written again: Tables and DataFrames are hashed before writing and skip the write entirely,
+    while streamed outputs are only hashed as they are written, so an unchanged stream is written
+    to the temporary file but never replaces the old one. Skipping an unchanged stream saves the
+    rename, the new hash and downstream rereads, but not its generation or write I/O. A stream that
+    yields no batches fails the step and keeps the old file, as there is no schema to write an
+    empty file with.
+
+    Assets whose rows only ever grow can set `write_mode: append` in their metadata. Each output
+    is then written as a new `part-*.parquet` file in the asset's (or partition's) directory
+    instead of replacing the old data, and the directory stands in for the file when loading.
+    Once a directory has more than `compaction.threshold` parts smaller than
+    `compaction.small_file_bytes`, they are merged into one in a background thread, which the
+    step's process waits for before exiting. Appended parts are never skipped as unchanged, but a
+    stream that yields no batches appends no part.
+
+    Downstream ops can either load this dataframe, load it as a pyarrow Table, or simply retrieve a path
+    to where the data is stored.
     """
 
-    def __init__(self, base_path) -> None:
+    def __init__(
+            self,
+            base_path,
+            write_options: Optional[Dict[str, Any]] = None,
+            skip_unchanged: bool = True,
+            compaction: Optional[Dict[str, int]] = None,
+        ) -> None:
         self._base_path = base_path
+        self._write_options = write_options or {}
+        self._skip_unchanged = skip_unchanged
+        self._compaction = {"threshold": 16, "small_file_bytes": 128 * 2**20, **(compaction or {})}
 
     def _get_path(self, context: Union[InputContext, OutputContext]):
         key = context.asset_key.path[-1]
 
         if context.has_asset_partitions:
-            start, end = context.asset_partitions_time_window
-            dt_format = "%Y%m%d%H%M%S"
-            partition_str = start.strftime(dt_format) + "_" + end.strftime(dt_format)
-            return os.path.join(self._base_path, key, f"{partition_str}.parquet")
+            return self._get_partition_path(context, context.asset_partition_key)
+        elif self._appends(context):
+            return os.path.join(self._base_path, key)
         else:
             return os.path.join(self._base_path, f"{key}.parquet")
 
+    def _get_partition_path(self, context: Union[InputContext, OutputContext], partition_key: str) -> str:
+        partition_dirs = [
+            f"{column}={value}" for column, value in zip(self._partition_columns(context), self._partition_values(context, partition_key))
+        ]
+        partition_path = os.path.join(self._base_path, context.asset_key.path[-1], *partition_dirs)
+        return partition_path if self._appends(context) else os.path.join(partition_path, "data.parquet")
+
+    def _appends(self, context: Union[InputContext, OutputContext]) -> bool:
+        """Whether the asset is written as appended part files, so its path is a directory."""
+        return self._output_metadata(context).get("write_mode", "overwrite") == "append"
+
+    def _files(self, context: Union[InputContext, OutputContext], path: str) -> str:
+        """`path` as a glob matching its parquet files."""
+        return os.path.join(path, "*.parquet") if self._appends(context) else path
+
+    def _partition_columns(self, context: Union[InputContext, OutputContext]) -> List[str]:
+        partitions_def = context.asset_partitions_def
+        if isinstance(partitions_def, MultiPartitionsDefinition):
+            return sorted(dimension.name for dimension in partitions_def.partitions_defs)
+        return [self._output_metadata(context).get("partition_column", "partition")]
+
+    def _output_metadata(self, context: Union[InputContext, OutputContext]) -> Dict[str, Any]:
+        output_context = context if isinstance(context, OutputContext) else context.upstream_output
+        return (output_context.metadata if output_context is not None else None) or {}
+
+    def _get_write_options(self, context: OutputContext) -> Dict[str, Any]:
+        return {**self._write_options, **self._output_metadata(context).get("write_options", {})}
+
+    def _partition_values(self, context: Union[InputContext, OutputContext], partition_key: str) -> List[str]:
+        if isinstance(context.asset_partitions_def, MultiPartitionsDefinition):
+            # Multi-dimensional keys join their values in dimension name order, as _partition_columns
+            return partition_key.split(MULTIPARTITION_KEY_DELIMITER)
+        return [partition_key]
+
     def handle_output(
             self, 
             context: OutputContext, 
-            obj: pd.DataFrame
+            obj: Union[pd.DataFrame, pa.Table, Iterator]
         ) -> None:
+        self._write_output(context, obj)
+
+    def _write_output(self, context: OutputContext, obj: Union[pd.DataFrame, pa.Table, Iterator]) -> bool:
+        """Writes `obj` to the asset's path. Returns False if it was skipped as unchanged."""
+        if isinstance(obj, pd.DataFrame):
+            obj = pa.Table.from_pandas(obj, preserve_index=False)
+        if self._appends(context):
+            return self._append_output(context, obj)
         path = self._get_path(context)
 
         os.makedirs(os.path.dirname(path), exist_ok=True)
         
-        if isinstance(obj, pd.DataFrame):
-            row_count = len(obj)
-            context.log.info(f"Row Count: {row_count}")
-            obj.to_parquet(path=path, index=False)
+        write_options = self._get_write_options(context)
+        hasher = ContentHasher(write_options)
+        previous_hash = self._previous_content_hash(path)
+        if isinstance(obj, pa.Table):
+            hasher.update(obj)
+            if hasher.hexdigest() == previous_hash:
+                return self._unchanged(context, path, obj.num_rows, previous_hash)
+            batches = [self._sorted(context, obj, write_options)]
+        elif isinstance(obj, Iterator):
+            batches = hasher.hashed(self._sorted(context, obj, write_options))
         else:
             raise Exception(f"Outpus of type {type(obj)} not supported.")
+        try:
+            with atomic_write(path) as tmp_path:
+                row_count = self._write_batches(tmp_path, batches, write_options)
+                if hasher.hexdigest() == previous_hash:
+                    raise _Unchanged()
+                # Dropped before the new file lands, so the old hash is never left next to new data
+                self._remove_content_hash(path)
+        except _Unchanged:
+            return self._unchanged(context, path, row_count, previous_hash)
+        except _Empty:
+            check.failed(f"The output for {path} yielded no batches, so there is no schema to write. The old file is kept.")
+        self._record_content_hash(path, hasher.hexdigest())
+        context.log.info(f"Row Count: {row_count}")
         
-        context.add_output_metadata({"row_count": row_count, "path": path})
-        
+        context.add_output_metadata({"row_count": row_count, "path": path, "content_hash": hasher.hexdigest(), "unchanged": False})
+        return True
+
+    def _append_output(self, context: OutputContext, obj: Union[pa.Table, Iterator]) -> bool:
+        directory = self._get_path(context)
+        os.makedirs(directory, exist_ok=True)
+        write_options = self._get_write_options(context)
+        hasher = ContentHasher(write_options)
+        if isinstance(obj, pa.Table):
+            obj = [self._sorted(context, obj, write_options)]
+        elif isinstance(obj, Iterator):
+            obj = self._sorted(context, obj, write_options)
+        else:
+            raise Exception(f"Outpus of type {type(obj)} not supported.")
+        path = _part_path(directory)
+        try:
+            with atomic_write(path) as tmp_path:
+                row_count = self._write_batches(tmp_path, hasher.hashed(obj), write_options)
+        except _Empty:
+            context.log.info(f"No rows to append to {directory}, no part written")
+            context.add_output_metadata({"row_count": 0, "path": directory, "unchanged": True})
+            return False
+        context.log.info(f"Row Count: {row_count}")
+        context.add_output_metadata({"row_count": row_count, "path": path, "content_hash": hasher.hexdigest(), "unchanged": False})
+
+        if len(self._small_parts(directory)) > self._compaction["threshold"]:
+            # Not a daemon, so the step's process finishes the compaction before it exits
+            threading.Thread(target=self._compact, args=(context.log, directory, write_options), name=f"compact {directory}").start()
+        return True
+
+    def _small_parts(self, directory: str) -> List[str]:
+        return sorted(
+            path for path in glob.glob(os.path.join(directory, "part-*.parquet"))
+            if os.path.getsize(path) < self._compaction["small_file_bytes"]
+        )
+
+    def _compact(self, log, directory: str, write_options: Dict[str, Any]) -> None:
+        """
+        Merges the small part files in `directory` into one. The merged file is renamed into place
+        before the parts are removed, so a scan listing the directory in between can briefly see
+        both, but never a partial file or missing rows.
+        """
+        # Hidden, so neither duckdb's *.parquet globs nor pyarrow's directory reads pick it up
+        with open(os.path.join(directory, ".compaction.lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another step is already compacting this directory
+                return
+            try:
+                parts = self._small_parts(directory)
+                if len(parts) < 2:
+                    return
+                batches = (pa.Table.from_batches([batch]) for part in parts for batch in pq.ParquetFile(part).iter_batches())
+                with atomic_write(_part_path(directory)) as tmp_path:
+                    row_count = self._write_batches(tmp_path, batches, write_options)
+                for part in parts:
+                    os.remove(part)
+                log.info(f"Compacted {len(parts)} parts ({row_count} rows) in {directory}")
+            except Exception as e:
+                log.warning(f"Compacting {directory} failed, leaving its parts as they are: {e!r}")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _unchanged(self, context: OutputContext, path: str, row_count: int, content_hash: str) -> bool:
+        context.log.info(f"Content hash {content_hash[:12]} matches {path}, skipping write")
+        context.add_output_metadata({"row_count": row_count, "path": path, "content_hash": content_hash, "unchanged": True})
+        return False
+
+    def _previous_content_hash(self, path: str) -> Optional[str]:
+        """The recorded hash of the file at `path`, or None when it can't be skipped."""
+        if not self._skip_unchanged or not os.path.exists(path):
+            return None
+        try:
+            with open(f"{path}.sha256") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _record_content_hash(self, path: str, content_hash: str) -> None:
+        with atomic_write(f"{path}.sha256") as tmp_path, open(tmp_path, "w") as f:
+            f.write(content_hash)
+
+    def _remove_content_hash(self, path: str) -> None:
+        if os.path.exists(f"{path}.sha256"):
+            os.remove(f"{path}.sha256")
+
+    def _sorted(self, context: OutputContext, obj: Union[pa.Table, Iterator], write_options: Dict[str, Any]) -> Union[pa.Table, Iterator]:
+        """`obj` sorted by the `sort_by` write option. Fails for streams, which can't be sorted as a whole."""
+        if not write_options.get("sort_by"):
+            return obj
+        if isinstance(obj, pa.Table):
+            return obj.sort_by([(column, "ascending") for column in write_options["sort_by"]])
+        check.failed(
+            f"{context.asset_key.to_user_string()} is streamed, so it can't be sorted by {write_options['sort_by']}. "
+            "Remove sort_by from its write_options or sort it before it is streamed."
+        )
+
+    def _write_batches(self, path: str, batches: Iterable[pa.Table], write_options: Dict[str, Any]) -> int:
+        writer = None
+        row_count = 0
+        try:
+            for batch in batches:
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        path,
+                        batch.schema,
+                        compression=write_options.get("compression", "snappy"),
+                        compression_level=write_options.get("compression_level"),
+                        use_dictionary=write_options.get("use_dictionary", True),
+                        write_statistics=write_options.get("write_statistics", True),
+                    )
+                # Each batch is one row group unless row_group_size splits it
+                row_group_size = write_options.get("row_group_size") or max(batch.num_rows, 1)
+                writer.write_table(batch.cast(writer.schema), row_group_size=row_group_size)
+                row_count += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise _Empty()
+        return row_count
 
-    def load_input(self, context: InputContext) -> Union[pd.DataFrame, str]:
+    def load_input(self, context: InputContext) -> Union[pd.DataFrame, pa.Table, str]:
         path = self._get_path(context)
         if context.dagster_type.typing_type == pd.DataFrame:
             return pd.read_parquet(path)
+        if context.dagster_type.typing_type == pa.Table:
+            return pq.read_table(path)
+        if context.dagster_type.typing_type == str:
+            return path
         
         return check.failed(
             f"Inputs of type {context.dagster_type} not supported. Please specify a valid type"
@@ -59,9 +420,17 @@ class ParquetIOManager(IOManager):
 
 
 @io_manager(
-    config_schema={"base_path": Field(str, is_required=False)},
+    config_schema={
+        "base_path": Field(str, is_required=False),
+        "write_options": WRITE_OPTIONS_SCHEMA,
+        "skip_unchanged": SKIP_UNCHANGED_SCHEMA,
+        "compaction": COMPACTION_SCHEMA,
+    },
 )
 def local_parquet_io_manager(init_context):
     return ParquetIOManager(
-        base_path=init_context.resource_config.get("base_path", "/Users/carlss/repos/.sandbox/data")
+        base_path=init_context.resource_config.get("base_path", "/Users/carlss/repos/.sandbox/data"),
+        write_options=init_context.resource_config.get("write_options"),
+        skip_unchanged=init_context.resource_config["skip_unchanged"],
+        compaction=init_context.resource_config.get("compaction"),
     )
@@ -0,0 +1,23 @@
+{#
+    Matches rows created or soft deleted in the run's window, from var('window_start') up to but
+    not including var('window_end'). Dagster passes the window of the day partition it builds.
+    Without them, e.g. in a manual `dbt run`, the window starts on the day of the latest change
+    already in the model's table, `watermark_columns` of {{ this }}, and has no end. An empty table
+    has no watermark, so every row is in the window.
+#}
+{% macro changed_in_window(columns, watermark_columns=none) %}
+    {%- set window_start = var('window_start', none) -%}
+    {%- set window_end = var('window_end', none) -%}
+    {%- if window_start is none -%}
+        {%- set start -%}
+            (SELECT coalesce(greatest({% for column in watermark_columns or columns %}max({{ column }}){{ ", " if not loop.last }}{% endfor %}), DATE '0001-01-01') FROM {{ this }})
+        {%- endset -%}
+    {%- else -%}
+        {%- set start = "DATE '" ~ window_start ~ "'" -%}
+    {%- endif -%}
+    (
+    {%- for column in columns %}
+        ({{ column }} >= {{ start }}{% if window_end is not none %} AND {{ column }} < DATE '{{ window_end }}'{% endif %}){{ " OR" if not loop.last }}
+    {%- endfor %}
+    )
+{%- endmacro %}
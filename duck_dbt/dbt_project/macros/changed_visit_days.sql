@@ -0,0 +1,9 @@
+{#
+    The days of facility_visits_daily holding a visit that was created or soft deleted in the run's
+    window. Selected on their own so they can be cleared before they are recounted.
+#}
+{% macro changed_visit_days() %}
+    SELECT DISTINCT CAST(cevm_created_on AS DATE) AS date_day
+    FROM {{ ref('inter_ce_fact') }}
+    WHERE {{ changed_in_window(['created_on', 'deleted_on', 'cevm_created_on', 'cevm_deleted_on'], ['date_day']) }}
+{%- endmacro %}
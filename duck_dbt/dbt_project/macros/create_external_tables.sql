@@ -1,20 +1,27 @@
+{#
+    With the parquet_native var, points each source with an `external.location` at its parquet
+    files instead of the views Dagster creates, so dbt reads the extracts directly.
+#}
 {% macro create_external_tables(select=none) %}
-    
-    {%- set source_nodes = graph.sources.values() if graph.sources else [] -%}
-    
-    {%- if source_nodes|length == 0 -%}
-        {%- do log('No external sources selected', info = true) -%}
-    {%- endif -%}
+    {%- if execute and var('parquet_native') -%}
 
-    {%- for node in source_nodes -%}
-        {%- if node.external -%}
-            {%- set external = node.external -%}
+        {%- set source_nodes = graph.sources.values() if graph.sources else [] -%}
 
-            CREATE SCHEMA IF NOT EXISTS {{node.source_name}};
-            CREATE OR REPLACE VIEW {{source(node.source_name, node.name).include(database=False)}} AS 
-            (
-                SELECT * FROM '{{external.location}}'
-            );
+        {%- if source_nodes|length == 0 -%}
+            {%- do log('No external sources selected', info = true) -%}
         {%- endif -%}
-    {%- endfor -%}
-{% endmacro %}
\ No newline at end of file
+
+        {%- for node in source_nodes -%}
+            {%- if node.external -%}
+                {%- set external = node.external -%}
+
+                CREATE SCHEMA IF NOT EXISTS {{node.source_name}};
+                CREATE OR REPLACE VIEW {{source(node.source_name, node.name).include(database=False)}} AS 
+                (
+                    SELECT * FROM read_parquet('{{external.location}}', hive_partitioning=true)
+                );
+            {%- endif -%}
+        {%- endfor -%}
+
+    {%- endif -%}
+{% endmacro %}
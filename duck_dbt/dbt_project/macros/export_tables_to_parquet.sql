@@ -1,12 +1,36 @@
-{% macro export_tables_to_parquet(select=none) %}
-    {%- if execute -%}
-        {%- set model_nodes = graph.nodes.values() | selectattr("resource_type", "equalto", "model") if graph.nodes else [] -%}
-
-        {%- for model in model_nodes -%}
-
-            {%- if  model.config.meta.to_parquet -%}
-
-                COPY {{model.schema}}.{{model.name}} to './{{model.name}}.parquet' (FORMAT PARQUET) ;
+{#
+    With the parquet_native var, writes each model built in this run with `meta.to_parquet` to
+    `{export_path}/{model}.parquet`, or with `meta.partition_by` to a Hive partitioned
+    `{export_path}/{model}/` directory. Partitions are overwritten in place, so a partition whose
+    rows all disappear keeps its old file.
+
+    Rows are sorted by `meta.cluster_by` and written in row groups of `meta.row_group_size` rows
+    when set, so readers can skip row groups by their min/max statistics.
+#}
+{% macro export_tables_to_parquet(results) %}
+    {%- if execute and var('parquet_native') -%}
+
+        {%- for result in results if result.status == 'success' and result.node.resource_type == 'model' -%}
+            {%- set model = result.node -%}
+
+            {%- if model.config.meta.to_parquet -%}
+                {%- set partition_by = model.config.meta.partition_by -%}
+                {%- set cluster_by = model.config.meta.cluster_by -%}
+                {%- set row_group_size = model.config.meta.row_group_size -%}
+                {%- set query -%}
+                    SELECT * FROM {{model.schema}}.{{model.name}}{% if cluster_by %} ORDER BY {{ cluster_by | join(', ') }}{% endif %}
+                {%- endset -%}
+                {%- set options -%}
+                    FORMAT PARQUET, COMPRESSION zstd{% if row_group_size %}, ROW_GROUP_SIZE {{ row_group_size }}{% endif %}
+                {%- endset -%}
+
+                {%- if partition_by %}
+                COPY ({{ query }}) TO '{{ var("export_path") }}/{{model.name}}'
+                    ({{ options }}, PARTITION_BY ({{ partition_by | join(', ') }}), OVERWRITE_OR_IGNORE true);
+                {%- else %}
+                COPY ({{ query }}) TO '{{ var("export_path") }}/{{model.name}}.parquet'
+                    ({{ options }});
+                {%- endif -%}
 
             {%- endif -%}
 
@@ -15,4 +39,3 @@
     {%- endif -%}
 
 {% endmacro %}
-
@@ -1,3 +1,11 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='id',
+        incremental_strategy='delete+insert'
+    )
+}}
+
 SELECT
     id,
     facility_id,
@@ -7,4 +15,8 @@ SELECT
     discharge_date,
     type,
     patient_id
-FROM {{ source('extracts', 'comprehensive_encounter') }}
\ No newline at end of file
+FROM {{ source('extracts', 'comprehensive_encounter') }}
+{% if is_incremental() %}
+-- Soft deleted encounters come through again and replace the row without deleted_on
+WHERE {{ changed_in_window(['created_on', 'deleted_on']) }}
+{% endif %}
@@ -1,3 +1,11 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='id',
+        incremental_strategy='delete+insert'
+    )
+}}
+
 SELECT
     id,
     comprehensive_encounter_id,
@@ -6,4 +14,8 @@ SELECT
     created_on,
     patient_id,
     is_sensitive
-FROM {{ source( 'extracts', 'ce_visit_map' ) }}
\ No newline at end of file
+FROM {{ source( 'extracts', 'ce_visit_map' ) }}
+{% if is_incremental() %}
+-- Soft deleted mappings come through again and replace the row without deleted_on
+WHERE {{ changed_in_window(['created_on', 'deleted_on']) }}
+{% endif %}
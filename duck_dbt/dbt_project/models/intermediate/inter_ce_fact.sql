@@ -1,3 +1,26 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='id',
+        incremental_strategy='delete+insert'
+    )
+}}
+{% set cluster_by = config.get('meta', {}).get('cluster_by') %}
+
+{% if is_incremental() %}
+-- An encounter's rows are rebuilt whenever it or any of its visit mappings changed, so the
+-- delete+insert on the encounter id replaces all of them
+{% set watermark_columns = ['created_on', 'deleted_on', 'cevm_created_on', 'cevm_deleted_on'] %}
+WITH changed_encounters AS (
+    SELECT id
+    FROM {{ ref("ce_cleaned") }}
+    WHERE {{ changed_in_window(['created_on', 'deleted_on'], watermark_columns) }}
+    UNION
+    SELECT comprehensive_encounter_id
+    FROM {{ ref("ce_visit_map_cleaned") }}
+    WHERE {{ changed_in_window(['created_on', 'deleted_on'], watermark_columns) }}
+)
+{% endif %}
 SELECT
     ce.id as id,
     ce.facility_id as facility_id,
@@ -16,4 +39,13 @@ SELECT
     cevm.is_sensitive as is_sensitive
 FROM {{ ref("ce_cleaned") }} ce
     LEFT JOIN {{ ref("ce_visit_map_cleaned") }} cevm 
-        ON ce.id = cevm.comprehensive_encounter_id
\ No newline at end of file
+        ON ce.id = cevm.comprehensive_encounter_id
+{% if is_incremental() %}
+WHERE ce.id IN (SELECT id FROM changed_encounters)
+{% endif %}
+{% if cluster_by %}
+-- Clustered so each row group holds few facilities and dates, and duckdb's zone maps skip the
+-- rest for filters on them. Incremental runs add their rows at the end of the table, so a
+-- --full-refresh clusters the whole table again
+ORDER BY {{ cluster_by | join(', ') }}
+{% endif %}
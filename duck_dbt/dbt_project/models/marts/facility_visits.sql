@@ -1,8 +1,8 @@
-SELECT *
-FROM {{
-    metrics.calculate(
-        metric('visit_count'),
-        grain='day',
-        dimensions=['facility_id', 'type']
-    )
-}}
\ No newline at end of file
+-- visit_count by day, facility and type, read from the daily rollup rather than calculated
+-- over inter_ce_fact on every build
+SELECT
+    date_day,
+    facility_id,
+    type,
+    visit_count
+FROM {{ ref('facility_visits_daily') }}
@@ -0,0 +1,25 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='date_day',
+        incremental_strategy='delete+insert',
+        pre_hook="{% if is_incremental() %}DELETE FROM {{ this }} WHERE date_day IN ({{ changed_visit_days() }}){% endif %}"
+    )
+}}
+
+-- Days holding a visit that was created or soft deleted in the window are recounted whole. The
+-- pre_hook clears them first, as delete+insert only replaces the days the recount still has rows
+-- for, and a facility and type whose count drops to zero has to lose its row
+SELECT
+    CAST(cevm_created_on AS DATE) AS date_day,
+    facility_id,
+    type,
+    count(patient_visit_id) AS visit_count
+FROM {{ ref('inter_ce_fact') }}
+-- The visit_count metric's filters
+WHERE deleted_on IS NOT NULL
+    AND cevm_deleted_on IS NOT NULL
+{% if is_incremental() %}
+    AND CAST(cevm_created_on AS DATE) IN ({{ changed_visit_days() }})
+{% endif %}
+GROUP BY 1, 2, 3
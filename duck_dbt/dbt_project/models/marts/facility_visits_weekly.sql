@@ -0,0 +1,7 @@
+SELECT
+    CAST(date_trunc('week', date_day) AS DATE) AS date_week,
+    facility_id,
+    type,
+    sum(visit_count) AS visit_count
+FROM {{ ref('facility_visits_daily') }}
+GROUP BY 1, 2, 3
@@ -1,8 +1,16 @@
-from collections import OrderedDict
+from bisect import bisect_right
+from contextvars import ContextVar
+import warnings
+import zlib
 from faker import Faker
-from dataclasses import dataclass, field
-from datetime import datetime
+from dataclasses import dataclass, field, fields, MISSING
+from datetime import datetime, date
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Optional
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 faker = Faker()
 
@@ -34,58 +42,362 @@ def _url():
     return faker.url()
 def _bban():
     return faker.bban()
+def _identifier():
+    return faker.bothify(_IDENTIFIER_FORMAT, letters=_UPPERCASE)
 def _int():
     return faker.pyint()
 
+# Batch generation
+# Each entry maps a per-row default_factory to a function `(n, rng) -> np.ndarray | pa.Array` that
+# builds the whole column in one call. Factories without an entry fall back to sampling from a pool of
+# per-row values, which keeps the distribution but is not reproducible from the seed.
+# Pools suit text that repeats anyway (names, cities). Identifier-like columns (account numbers,
+# identifiers, emails) are built from the rng instead, so they stay distinct at any row count.
+_BATCH_FACTORIES:Dict[Callable, Callable] = {}
+_TEXT_POOL_SIZE = 10_000
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UPPERCASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# faker's default bban and the facility identifier format: ? is a letter, # a digit
+_BBAN_FORMAT = "????##############"
+_IDENTIFIER_FORMAT = "????-########"
+_pool_faker = Faker()
+# Date generated dates are relative to, set by `DataClassDF.generate(as_of=...)`. None means today
+_AS_OF:ContextVar[Optional[date]] = ContextVar("as_of", default=None)
+
+def _register_batch(factory:Callable, batch:Callable) -> None:
+    _BATCH_FACTORIES[factory] = batch
+
+def _object_array(values) -> np.ndarray:
+    # np.array would split tuples (e.g. local_latlng) into a 2d array
+    arr = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        arr[i] = value
+    return arr
+
+def _hex_strings(raw:np.ndarray) -> np.ndarray:
+    """Hex-encodes each row of an (n, k) uint8 array into an (n, 2k) array of ascii codes."""
+    digits = np.empty((raw.shape[0], raw.shape[1] * 2), dtype=np.uint8)
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    return digits
+
+def _fixed_width_strings(chars:np.ndarray) -> pa.Array:
+    """Wraps an (n, width) array of ascii codes as an arrow string array without copying per value."""
+    n, width = chars.shape
+    string_type, offset_type = (pa.string(), np.int32) if n * width < 2**31 else (pa.large_string(), np.int64)
+    offsets = np.arange(0, (n + 1) * width, width, dtype=offset_type)
+    return pa.Array.from_buffers(string_type, n, [None, pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(chars))])
+
+def _uuid4_batch(n:int, rng:np.random.Generator) -> pa.Array:
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40 # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80 # RFC 4122 variant
+    digits = _hex_strings(raw)
+    out = np.full((n, 36), ord("-"), dtype=np.uint8)
+    out[:, 0:8] = digits[:, 0:8]
+    out[:, 9:13] = digits[:, 8:12]
+    out[:, 14:18] = digits[:, 12:16]
+    out[:, 19:23] = digits[:, 16:20]
+    out[:, 24:36] = digits[:, 20:32]
+    return _fixed_width_strings(out)
+
+# Key columns (`id` and `*_id` fields generated by _uuid4) can be emitted in a more compact format:
+#   "uuid"   - 36 character strings, as the per-row dataclasses produce
+#   "binary" - the same 16 random bytes as fixed_size_binary(16), like the binary(16) source columns
+#   "int64"  - dense surrogate keys for `id` (key_offset + row number), random int64 for foreign keys
+KEY_FORMATS = ("uuid", "binary", "int64")
+
+def _is_key(name:str) -> bool:
+    return name == "id" or name.endswith("_id")
+
+def _key_batch(key_format:str, n:int, rng:np.random.Generator, key_offset:Optional[int]=None) -> pa.Array:
+    """Keys in `key_format`. A `key_offset` makes int64 keys dense, starting at that offset."""
+    if key_format == "uuid":
+        return _uuid4_batch(n, rng)
+    if key_format == "binary":
+        raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        return pa.Array.from_buffers(pa.binary(16), n, [None, pa.py_buffer(raw)])
+    if key_format == "int64":
+        if key_offset is not None:
+            return pa.array(np.arange(key_offset, key_offset + n, dtype=np.int64))
+        return pa.array(rng.integers(0, np.iinfo(np.int64).max, size=n, dtype=np.int64))
+    raise ValueError(f"key_format must be one of {KEY_FORMATS}, got {key_format!r}")
+
+def _sha256_batch(n:int, rng:np.random.Generator) -> pa.Array:
+    raw = rng.integers(0, 256, size=(n, 32), dtype=np.uint8)
+    return _fixed_width_strings(_hex_strings(raw))
+
+def _bothify_batch(pattern:str) -> Callable:
+    """Batch counterpart of faker.bothify with uppercase letters, drawing every character from the rng."""
+    letters = np.array([char == "?" for char in pattern])
+    digits = np.array([char == "#" for char in pattern])
+    literal = np.frombuffer(pattern.encode(), dtype=np.uint8)
+    def batch(n:int, rng:np.random.Generator) -> pa.Array:
+        chars = np.tile(literal, (n, 1))
+        chars[:, letters] = rng.integers(ord("A"), ord("Z") + 1, size=(n, int(letters.sum())), dtype=np.uint8)
+        chars[:, digits] = rng.integers(ord("0"), ord("9") + 1, size=(n, int(digits.sum())), dtype=np.uint8)
+        return _fixed_width_strings(chars)
+    return batch
+
+def _email_batch(n:int, rng:np.random.Generator) -> pa.Array:
+    # faker.company_email() is "{user_name}@{domain_name}". Drawing each part from its own pool gives
+    # _TEXT_POOL_SIZE ** 2 distinct emails
+    return pc.binary_join_element_wise(
+        pa.array(_user_names(n, rng), type=pa.string()), pa.array(_domain_names(n, rng), type=pa.string()), "@"
+    )
+
+def _past_date_batch(n:int, rng:np.random.Generator) -> np.ndarray:
+    # faker.past_date() draws from [today - 30d, today - 1d]
+    return np.datetime64(_AS_OF.get() or date.today(), "D") - rng.integers(1, 31, size=n)
+
+def _int_batch(n:int, rng:np.random.Generator) -> np.ndarray:
+    # faker.pyint() defaults to [0, 9999]
+    return rng.integers(0, 10_000, size=n)
+
+def _pool_batch(make_value:Callable) -> Callable:
+    def batch(n:int, rng:np.random.Generator) -> np.ndarray:
+        pool = _object_array([make_value() for _ in range(min(max(n, 1), _TEXT_POOL_SIZE))])
+        return pool[rng.integers(0, len(pool), size=n)]
+    return batch
+
+def _faker_pool(method:str, **kwargs) -> Callable:
+    """
+    Samples from a pool of Faker values.
+
+    The pool is built once per process from a fixed seed, so every batch, shard and worker draws
+    from the same values and only the sampled positions depend on the batch rng.
+    """
+    pool = []
+    def batch(n:int, rng:np.random.Generator) -> np.ndarray:
+        if not pool:
+            _pool_faker.seed_instance(zlib.crc32(repr((method, sorted(kwargs.items()))).encode()))
+            pool.append(_object_array([getattr(_pool_faker, method)(**kwargs) for _ in range(_TEXT_POOL_SIZE)]))
+        return pool[0][rng.integers(0, _TEXT_POOL_SIZE, size=n)]
+    return batch
+
+class CategoricalSampler():
+    """
+    A (value, weight) frequency table compiled once into a cumulative-probability array.
+
+    Calling the sampler draws one value through faker's random source, so `Faker.seed` still
+    controls per-row output. `batch` draws n values with a single searchsorted over the array.
+    Values that are themselves factories (e.g. `_uuid4`) are called to produce the value.
+    """
+
+    def __init__(self, frequency:list) -> None:
+        self.values = _object_array([value for value, _ in frequency])
+        weights = np.array([weight for _, weight in frequency], dtype=float)
+        self.cumulative = np.cumsum(weights) / weights.sum()
+        self.cumulative[-1] = 1.0
+        self._cumulative = self.cumulative.tolist()
+        self._factories = [i for i, value in enumerate(self.values) if callable(value)]
+
+    def __call__(self):
+        value = self.values[bisect_right(self._cumulative, faker.random.random())]
+        return value() if callable(value) else value
+
+    def batch(self, n:int, rng:np.random.Generator) -> np.ndarray:
+        index = np.searchsorted(self.cumulative, rng.random(n), side="right")
+        out = self.values[index]
+        for i in self._factories:
+            mask = index == i
+            factory = self.values[i]
+            out[mask] = _BATCH_FACTORIES.get(factory, _pool_batch(factory))(int(mask.sum()), rng)
+        return out
+
+SAMPLERS:Dict[str, CategoricalSampler] = {}
+
+def _sampler(name:str, frequency:list) -> CategoricalSampler:
+    """Compiles a frequency table into the shared registry and wires up its batch path."""
+    if name not in SAMPLERS:
+        SAMPLERS[name] = CategoricalSampler(frequency)
+        _register_batch(SAMPLERS[name], SAMPLERS[name].batch)
+    return SAMPLERS[name]
+
+_register_batch(_uuid4, _uuid4_batch)
+_register_batch(_past_date, _past_date_batch)
+_register_batch(_int, _int_batch)
+_register_batch(faker.sha256, _sha256_batch)
+_register_batch(faker.sentence, _faker_pool("sentence"))
+_register_batch(_company, _faker_pool("company"))
+_register_batch(_name, _faker_pool("name"))
+_register_batch(_base_location, _faker_pool("local_latlng", country_code="US"))
+_register_batch(_address, _faker_pool("address"))
+_register_batch(_phone, _faker_pool("phone_number"))
+_user_names = _faker_pool("user_name")
+_domain_names = _faker_pool("domain_name")
+_register_batch(_company_email, _email_batch)
+_register_batch(_city, _faker_pool("city"))
+_register_batch(_zip, _faker_pool("zipcode"))
+_register_batch(_url, _faker_pool("url"))
+_register_batch(_bban, _bothify_batch(_BBAN_FORMAT))
+_register_batch(_identifier, _bothify_batch(_IDENTIFIER_FORMAT))
+
+# Low cardinality text columns are dictionary encoded in each class's arrow_schema
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+def _typed(values:np.ndarray, type:pa.DataType) -> pa.Array:
+    """Casts a generated column to its schema type, None becoming a real null."""
+    return pa.array(values, from_pandas=True).cast(type)
+
+def _slotted(cls):
+    """
+    Rebuilds a dataclass with __slots__ and no per-instance __dict__, what dataclass(slots=True)
+    does on Python 3.10+. Field defaults live on the dataclass' __init__, so they can be dropped
+    from the class namespace to make room for the slot descriptors.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items() if key not in names + ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
 class DataClassDF():
 
+    __slots__ = ()
+
+    # Subclasses declare the Arrow type of every column generate() returns
+    arrow_schema:pa.Schema = pa.schema([])
+
     def return_df(self)->pd.DataFrame:
-        df:pd.DataFrame = pd.DataFrame.from_dict(self.__dict__.items()).set_index(0).transpose()
-        return df
+        warnings.warn(
+            "return_df builds a DataFrame per row, use to_pandas(instances) on a batch of rows or generate() instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return type(self).to_pandas([self])
+
+    @classmethod
+    def to_arrow(cls, instances:Iterable["DataClassDF"]) -> pa.Table:
+        """
+        Converts a list or iterator of instances to a pyarrow Table typed by `arrow_schema`.
 
-@dataclass()
+        Keys keep the type they were created with, as with array overrides in `generate`,
+        so int facility ids still join to an int `id`.
+        """
+        names = cls.arrow_schema.names
+        get_row = attrgetter(*names)
+        rows = [get_row(row) for row in instances]
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        arrays = []
+        for name, values in zip(names, columns):
+            type = cls.arrow_schema.field(name).type
+            array = pa.array(values, from_pandas=True)
+            if _is_key(name) and not pa.types.is_string(array.type) and not pa.types.is_null(array.type):
+                arrays.append(array)
+            else:
+                arrays.append(array.cast(type))
+        return pa.table(dict(zip(names, arrays)))
+
+    @classmethod
+    def to_pandas(cls, instances:Iterable["DataClassDF"]) -> pd.DataFrame:
+        """`to_arrow` as a DataFrame, dictionary encoded columns becoming categoricals."""
+        return cls.to_arrow(instances).to_pandas()
+
+    @classmethod
+    def generate(
+            cls,
+            n:int,
+            seed:Optional[int]=None,
+            key_format:str="uuid",
+            key_offset:int=0,
+            as_of:Optional[date]=None,
+            **overrides
+        ) -> pa.Table:
+        """
+        Generates n rows as whole columns instead of one instance at a time.
+
+        Keyword overrides replace a generated column with a scalar or an array of length n,
+        e.g. `PatientVisitDataClass.generate(1000, seed=1, facility_id=facility_ids)`.
+        `key_format` is one of KEY_FORMATS. With "int64", `id` runs from `key_offset` so
+        batches of one table can be given non-overlapping keys. Dates are drawn relative to
+        `as_of` rather than today, so a seed reproduces the same table on any day.
+
+        Columns are typed by `arrow_schema`, except array overrides and non-uuid keys.
+        """
+        rng = np.random.default_rng(seed)
+        columns = {}
+        typed = set()
+        as_of_token = _AS_OF.set(as_of)
+        try:
+            for f in fields(cls):
+                if f.name in overrides:
+                    value = overrides[f.name]
+                    if isinstance(value, (pa.Array, pa.ChunkedArray)):
+                        columns[f.name] = value
+                        typed.add(f.name)
+                    elif isinstance(value, (list, np.ndarray, pd.Series)):
+                        columns[f.name] = np.asarray(value)
+                        typed.add(f.name)
+                    else:
+                        columns[f.name] = np.full(n, value, dtype=object)
+                elif key_format != "uuid" and f.default_factory is _uuid4 and _is_key(f.name):
+                    columns[f.name] = _key_batch(key_format, n, rng, key_offset if f.name == "id" else None)
+                    typed.add(f.name)
+                elif f.default_factory is not MISSING:
+                    batch = _BATCH_FACTORIES.get(f.default_factory, _pool_batch(f.default_factory))
+                    columns[f.name] = batch(n, rng)
+                elif f.default is not MISSING:
+                    columns[f.name] = np.full(n, f.default, dtype=object)
+        finally:
+            _AS_OF.reset(as_of_token)
+        columns = cls._post_generate(columns)
+        order = [f.name for f in fields(cls) if f.name in columns]
+        order += [name for name in columns if name not in order]
+        # Overridden and non-uuid key columns keep their own type so they still join to their parent
+        schema = cls.arrow_schema
+        return pa.table({
+            name: columns[name] if name in typed or name not in schema.names else _typed(columns[name], schema.field(name).type)
+            for name in order
+        })
+
+    @classmethod
+    def _post_generate(cls, columns:Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Batch counterpart of __post_init__, for fields derived from other columns."""
+        return columns
+
+@_slotted
+@dataclass
 class FacilityDataClass(DataClassDF):
     
-    def _participating():
-        return faker.random_element(elements=OrderedDict([(0,0.8),(1,0.2)]))
-
-    def _type():
-        _types = [
-            ("?", 0.725985594722553),
-            ("snf", 0.100029169564925),
-            ("h", 0.0650256916552606),
-            ("c", 0.0445845580810914),
-            ("f", 0.00792065878340476),
-            ("x", 0.00740458186550587),
-            ("v", 0.00617048488792156),
-            ("s", 0.00583391298494402),
-            ("hha", 0.00543002670137097),
-            ("p", 0.00385935782080912),
-            ("m", 0.00370229093275293),
-            ("o", 0.00325352839544955),
-            ("u", 0.00296183274620235),
-            ("fq", 0.00278232773128099),
-            ("z", 0.00242331770143828),
-            ("alf", 0.00237844144770795),
-            ("g", 0.00159310700742702),
-            ("ssa", 0.00143604011937084),
-            ("msbh", 0.00134628761191016),
-            ("y", 0.00123409697758431),
-            ("sat", 0.00096483945520228),
-            ("hr", 0.000785334440280925),
-            ("hp", 0.000471200664168555),
-            ("ems", 0.000448762537303386),
-            ("hie", 0.000403886283573047),
-            ("l", 0.000359010029842709),
-            ("d", 0.000291695649247201),
-            ("t", 0.000269257522382032),
-            ("ob", 0.000224381268651693),
-            ("i", 0.000179505014921354),
-            ("a", 0.000112190634325846),
-            ("b", 0.00008975250746),
-            ("rh", 0.0000044876254),
-        ]
-        return faker.random_element(elements=OrderedDict(_types))
+    _participating = _sampler("FacilityDataClass.participating", [(0,0.8),(1,0.2)])
+
+    _type = _sampler("FacilityDataClass.type", [
+        ("?", 0.725985594722553),
+        ("snf", 0.100029169564925),
+        ("h", 0.0650256916552606),
+        ("c", 0.0445845580810914),
+        ("f", 0.00792065878340476),
+        ("x", 0.00740458186550587),
+        ("v", 0.00617048488792156),
+        ("s", 0.00583391298494402),
+        ("hha", 0.00543002670137097),
+        ("p", 0.00385935782080912),
+        ("m", 0.00370229093275293),
+        ("o", 0.00325352839544955),
+        ("u", 0.00296183274620235),
+        ("fq", 0.00278232773128099),
+        ("z", 0.00242331770143828),
+        ("alf", 0.00237844144770795),
+        ("g", 0.00159310700742702),
+        ("ssa", 0.00143604011937084),
+        ("msbh", 0.00134628761191016),
+        ("y", 0.00123409697758431),
+        ("sat", 0.00096483945520228),
+        ("hr", 0.000785334440280925),
+        ("hp", 0.000471200664168555),
+        ("ems", 0.000448762537303386),
+        ("hie", 0.000403886283573047),
+        ("l", 0.000359010029842709),
+        ("d", 0.000291695649247201),
+        ("t", 0.000269257522382032),
+        ("ob", 0.000224381268651693),
+        ("i", 0.000179505014921354),
+        ("a", 0.000112190634325846),
+        ("b", 0.00008975250746),
+        ("rh", 0.0000044876254),
+    ])
 
     id:str = field(default_factory=_uuid4)
     name:str = field(default_factory=_company)
@@ -102,37 +414,71 @@ class FacilityDataClass(DataClassDF):
     country:str = field(init=False)
     parent_facility_id:str = field(default_factory=_uuid4)
     type:str = field(default_factory=_type)
-    latitude:str = field(init=False)
-    longitude:str = field(init=False)
+    latitude:float = field(init=False)
+    longitude:float = field(init=False)
     url:str = field(default_factory=_url)
     created_by:datetime = field(default_factory=_past_date)
     created_on:datetime = field(default_factory=_past_date)
     last_update:datetime = field(default_factory=_past_date)
-    location:str = field(default_factory=_base_location)
+    county:str = field(init=False)
+    # (latitude, longitude, county, country, timezone) the fields above are derived from
+    location:tuple = field(default_factory=_base_location, repr=False, compare=False)
+
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("address", pa.string()),
+        ("address2", pa.string()),
+        ("phone", pa.string()),
+        ("contact_name", pa.string()),
+        ("participating", pa.int8()),
+        ("join_date", pa.date32()),
+        ("email", pa.string()),
+        ("city", pa.string()),
+        ("state", _CATEGORY),
+        ("zip", pa.string()),
+        ("country", _CATEGORY),
+        ("parent_facility_id", pa.string()),
+        ("type", _CATEGORY),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("url", pa.string()),
+        ("created_by", pa.date32()),
+        ("created_on", pa.date32()),
+        ("last_update", pa.date32()),
+        ("county", pa.string()),
+    ])
 
     def __post_init__(self):
-        self.latitude = self.location[0]
-        self.longitude = self.location[1]
+        self.latitude = float(self.location[0])
+        self.longitude = float(self.location[1])
         self.county = self.location[2]
         self.country = self.location[3]
         self.state = self.location[4].split("/")[1]
-        del self.location
 
+    @classmethod
+    def _post_generate(cls, columns):
+        location = columns.pop("location")
+        columns["latitude"] = np.array([loc[0] for loc in location], dtype=object)
+        columns["longitude"] = np.array([loc[1] for loc in location], dtype=object)
+        columns["county"] = np.array([loc[2] for loc in location], dtype=object)
+        columns["country"] = np.array([loc[3] for loc in location], dtype=object)
+        columns["state"] = np.array([loc[4].split("/")[1] for loc in location], dtype=object)
+        return columns
+
+@_slotted
 @dataclass
 class ComprehensiveEncounterDataClass(DataClassDF):
-    def _type():
-        types_frequency = [
-            ("BEHAVIORAL_HEALTH",0.0005),
-            ("EMERGENCY",0.183),
-            ("INPATIENT",0.071),
-            ("NULL",0.0005),
-            ("POST_ACUTE_CARE",0.0105),
-            ("UNKNOWN",0.7345),
-        ]
-        return faker.random_element(elements=OrderedDict(types_frequency))
+    _type = _sampler("ComprehensiveEncounterDataClass.type", [
+        ("BEHAVIORAL_HEALTH",0.0005),
+        ("EMERGENCY",0.183),
+        ("INPATIENT",0.071),
+        (None,0.0005),
+        ("POST_ACUTE_CARE",0.0105),
+        ("UNKNOWN",0.7345),
+    ])
 
-    def _matching_method():
-        return faker.random_element(elements=OrderedDict([("ACCOUNT_NUMBER",0.64),("BILLING_ACCOUNT_NUMBER",0.36)]))
+    _matching_method = _sampler("ComprehensiveEncounterDataClass.matching_method", [("ACCOUNT_NUMBER",0.64),("BILLING_ACCOUNT_NUMBER",0.36)])
 
 
     id:str = field(default_factory=_uuid4)
@@ -146,56 +492,62 @@ class ComprehensiveEncounterDataClass(DataClassDF):
     type:str = field(default_factory=_type)
     patient_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("facility_id", pa.string()),
+        ("created_on", pa.date32()),
+        ("deleted_on", pa.date32()),
+        ("matching_method", _CATEGORY),
+        ("matching_method_identifier", pa.string()),
+        ("admit_date", pa.date32()),
+        ("discharge_date", pa.date32()),
+        ("type", _CATEGORY),
+        ("patient_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientVisitDataClass(DataClassDF):
-    def _discharge_disposition():
-        discharge_disposition_frequency = [
-            (1, 0.4135),
-            (2, 0.0015),
-            (3, 0.0025),
-            (4, 0.0005),
-            (5, 0.002),
-            (6, 0.0065),
-            (7, 0.004),
-            (8, 0.0015),
-            (9, 0.0035),
-            (20, 0.002),
-            (30, 0.005),
-            (68, 0.0005),
-            (70, 0.009),
-            (76, 0.0005),
-            (118, 0.001),
-            (119, 0.0015),
-            (120, 0.0015),
-            (126, 0.0005),
-            (127, 0.002),
-            (None, 0.541),
-        ]
-        return faker.random_element(elements=OrderedDict(discharge_disposition_frequency))
-    
-    def _major_class():
-        major_class_frequency = [
-            ("A", 0.004),
-            ("C", 0.0095),
-            ("E", 0.2445),
-            ("I", 0.0595),
-            ("L", 0.0085),
-            ("NULL", 0.001),
-            ("O", 0.6145),
-            ("P", 0.037),
-            ("R", 0.001),
-            ("U", 0.0075),
-            ("V", 0.013),
-        ]
-        return faker.random_element(elements=OrderedDict(major_class_frequency))
-        
-    def _sensitive_categories():
-        sensitive_categories_frequency = [
-            (0, 0.995),
-            (4, 0.0015),
-            (6, 0.0035),
-        ]
-        return faker.random_element(elements=OrderedDict(sensitive_categories_frequency))
+    _discharge_disposition = _sampler("PatientVisitDataClass.discharge_disposition", [
+        (1, 0.4135),
+        (2, 0.0015),
+        (3, 0.0025),
+        (4, 0.0005),
+        (5, 0.002),
+        (6, 0.0065),
+        (7, 0.004),
+        (8, 0.0015),
+        (9, 0.0035),
+        (20, 0.002),
+        (30, 0.005),
+        (68, 0.0005),
+        (70, 0.009),
+        (76, 0.0005),
+        (118, 0.001),
+        (119, 0.0015),
+        (120, 0.0015),
+        (126, 0.0005),
+        (127, 0.002),
+        (None, 0.541),
+    ])
+    _major_class = _sampler("PatientVisitDataClass.major_class", [
+        ("A", 0.004),
+        ("C", 0.0095),
+        ("E", 0.2445),
+        ("I", 0.0595),
+        ("L", 0.0085),
+        (None, 0.001),
+        ("O", 0.6145),
+        ("P", 0.037),
+        ("R", 0.001),
+        ("U", 0.0075),
+        ("V", 0.013),
+    ])
+    _sensitive_categories = _sampler("PatientVisitDataClass.sensitive_categories", [
+        (0, 0.995),
+        (4, 0.0015),
+        (6, 0.0035),
+    ])
 
     id:str = field(default_factory=_uuid4)
     patient_id:str = field(default_factory=_uuid4)
@@ -212,14 +564,31 @@ class PatientVisitDataClass(DataClassDF):
     billing_account_number:str = field(default_factory=_bban)
     sensitive_categories:int = field(default_factory=_sensitive_categories)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("patient_id", pa.string()),
+        ("admit_date", pa.date32()),
+        ("created_on", pa.date32()),
+        ("account_number", pa.string()),
+        ("discharge_date", pa.date32()),
+        ("data_source", pa.string()),
+        ("facility_id", pa.string()),
+        ("discharge_disposition", pa.int16()),
+        ("visit_type", pa.int32()),
+        ("transfer_date", pa.date32()),
+        ("major_class", _CATEGORY),
+        ("billing_account_number", pa.string()),
+        ("sensitive_categories", pa.int8()),
+    ])
+
+@_slotted
 @dataclass
 class ComprehensiveEncounterMapDataClass(DataClassDF):
-    def _deleted_on():
-        deleted_on_frequency = [
-            (None, 0.8),
-            (faker.past_date(), 0.2)
-        ]
-        return faker.random_element(elements=OrderedDict(deleted_on_frequency))
+    # _past_date is called per draw so deleted rows get their own date
+    _deleted_on = _sampler("ComprehensiveEncounterMapDataClass.deleted_on", [
+        (None, 0.8),
+        (_past_date, 0.2)
+    ])
 
     id:str = field(default_factory=_uuid4)
     comprehensive_encounter_id:str = field(default_factory=_uuid4)
@@ -229,6 +598,17 @@ class ComprehensiveEncounterMapDataClass(DataClassDF):
     patient_id:str = field(default_factory=_uuid4)
     is_sensitive:int = field(default=0)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("comprehensive_encounter_id", pa.string()),
+        ("patient_visit_id", pa.string()),
+        ("deleted_on", pa.date32()),
+        ("created_on", pa.date32()),
+        ("patient_id", pa.string()),
+        ("is_sensitive", pa.int8()),
+    ])
+
+@_slotted
 @dataclass
 class PatientLanguageDataClass(DataClassDF):
     id:str = field(default_factory=_uuid4)
@@ -241,17 +621,28 @@ class PatientLanguageDataClass(DataClassDF):
     code:str = field(default="ENG")
     insert_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("last_seen", pa.date32()),
+        ("patient_id", pa.string()),
+        ("facility_id", pa.string()),
+        ("data_source_id", pa.string()),
+        ("code", _CATEGORY),
+        ("insert_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientDisabilityDataClass(DataClassDF):
-    def _code_frequency():
-        code_frequency = [
-            ("UK", 0.99),
-            ("DREM", 0.006),
-            ("DEYE", 0.0014),
-            ("DPHY", 0.0014),
-            ("DEAR", 0.0012),
-        ]
-        return faker.random_element(elements=OrderedDict(code_frequency))
+    _code_frequency = _sampler("PatientDisabilityDataClass.code", [
+        ("UK", 0.99),
+        ("DREM", 0.006),
+        ("DEYE", 0.0014),
+        ("DPHY", 0.0014),
+        ("DEAR", 0.0012),
+    ])
 
     id:str = field(default_factory=_uuid4)
     created_on:datetime = field(default_factory=_past_date)
@@ -263,19 +654,30 @@ class PatientDisabilityDataClass(DataClassDF):
     code:str = field(default_factory=_code_frequency)
     insert_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("last_seen", pa.date32()),
+        ("patient_id", pa.string()),
+        ("facility_id", pa.string()),
+        ("data_source_id", pa.string()),
+        ("code", _CATEGORY),
+        ("insert_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientMaritalDataClass(DataClassDF):
-    def _code_frequency():
-        code_frequency = [
-            ("S", 0.5838),
-            ("M", 0.2452),
-            ("D", 0.073),
-            ("W", 0.0572),
-            ("SP", 0.024),
-            ("O", 0.0132),
-            ("LP", 0.0036),
-        ]
-        return faker.random_element(elements=OrderedDict(code_frequency))
+    _code_frequency = _sampler("PatientMaritalDataClass.code", [
+        ("S", 0.5838),
+        ("M", 0.2452),
+        ("D", 0.073),
+        ("W", 0.0572),
+        ("SP", 0.024),
+        ("O", 0.0132),
+        ("LP", 0.0036),
+    ])
 
     id:str = field(default_factory=_uuid4)
     created_on:datetime = field(default_factory=_past_date)
@@ -287,27 +689,38 @@ class PatientMaritalDataClass(DataClassDF):
     code:str = field(default_factory=_code_frequency)
     insert_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("last_seen", pa.date32()),
+        ("patient_id", pa.string()),
+        ("facility_id", pa.string()),
+        ("data_source_id", pa.string()),
+        ("code", _CATEGORY),
+        ("insert_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientRaceDataClass(DataClassDF):
-    def _code_frequency():
-        code_frequency = [
-            ("W", 0.8526),
-            ("OR", 0.074),
-            ("B", 0.0546),
-            ("AI", 0.0056),
-            ("AS", 0.0032),
-            ("ASI", 0.0028),
-            ("HI", 0.0022),
-            ("UK", 0.0018),
-            ("AIAN", 0.001),
-            ("CH", 0.0006),
-            ("FL", 0.0006),
-            ("D", 0.0004),
-            ("KR", 0.0002),
-            ("NH", 0.0002),
-            ("VT", 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(code_frequency))
+    _code_frequency = _sampler("PatientRaceDataClass.code", [
+        ("W", 0.8526),
+        ("OR", 0.074),
+        ("B", 0.0546),
+        ("AI", 0.0056),
+        ("AS", 0.0032),
+        ("ASI", 0.0028),
+        ("HI", 0.0022),
+        ("UK", 0.0018),
+        ("AIAN", 0.001),
+        ("CH", 0.0006),
+        ("FL", 0.0006),
+        ("D", 0.0004),
+        ("KR", 0.0002),
+        ("NH", 0.0002),
+        ("VT", 0.0002),
+    ])
 
     id:str = field(default_factory=_uuid4)
     created_on:datetime = field(default_factory=_past_date)
@@ -319,24 +732,35 @@ class PatientRaceDataClass(DataClassDF):
     code:str = field(default_factory=_code_frequency)
     insert_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("last_seen", pa.date32()),
+        ("patient_id", pa.string()),
+        ("facility_id", pa.string()),
+        ("data_source_id", pa.string()),
+        ("code", _CATEGORY),
+        ("insert_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientEthnicityDataClass(DataClassDF):
-    def _code_frequency():
-        code_frequency = [
-            ("NHL", 0.7812),
-            ("CA", 0.075),
-            ("UK", 0.0364),
-            ("HO", 0.0356),
-            ("HL", 0.0272),
-            ("DO", 0.0136),
-            ("ME", 0.0114),
-            ("GU", 0.0098),
-            ("PR", 0.0072),
-            ("CH", 0.0016),
-            ("D", 0.0008),
-            ("CU", 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(code_frequency))
+    _code_frequency = _sampler("PatientEthnicityDataClass.code", [
+        ("NHL", 0.7812),
+        ("CA", 0.075),
+        ("UK", 0.0364),
+        ("HO", 0.0356),
+        ("HL", 0.0272),
+        ("DO", 0.0136),
+        ("ME", 0.0114),
+        ("GU", 0.0098),
+        ("PR", 0.0072),
+        ("CH", 0.0016),
+        ("D", 0.0008),
+        ("CU", 0.0002),
+    ])
 
     id:str = field(default_factory=_uuid4)
     created_on:datetime = field(default_factory=_past_date)
@@ -348,82 +772,91 @@ class PatientEthnicityDataClass(DataClassDF):
     code:str = field(default_factory=_code_frequency)
     insert_id:str = field(default_factory=_uuid4)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("last_seen", pa.date32()),
+        ("patient_id", pa.string()),
+        ("facility_id", pa.string()),
+        ("data_source_id", pa.string()),
+        ("code", _CATEGORY),
+        ("insert_id", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class PatientDiagnosisDataClass(DataClassDF):
-    def _priority_frequency():
-        priority_frequency = [
-            ("NULL", 0.7034),
-            ("1", 0.076),
-            ("2", 0.053),
-            ("0", 0.034),
-            ("3", 0.022),
-            ("4", 0.0196),
-            ("5", 0.0152),
-            ("6", 0.0102),
-            ("8", 0.0096),
-            ("7", 0.009),
-            ("9", 0.0064),
-            ("11", 0.0044),
-            ("12", 0.0044),
-            ("10", 0.0032),
-            ("13", 0.0026),
-            ("99", 0.0024),
-            ("18400", 0.002),
-            ("14", 0.0018),
-            ("15", 0.0018),
-            ("16", 0.0018),
-            ("17", 0.0018),
-            ("19", 0.0016),
-            ("18", 0.0014),
-            ("-1", 0.0012),
-            ("20", 0.0012),
-            ("21", 0.0012),
-            ("25", 0.0008),
-            ("22", 0.0006),
-            ("23", 0.0006),
-            ("27", 0.0006),
-            ("24", 0.0004),
-            ("26", 0.0004),
-            ("28", 0.0004),
-            ("40", 0.0004),
-            ("10800", 0.0004),
-            ("29", 0.0002),
-            ("30", 0.0002),
-            ("31", 0.0002),
-            ("32", 0.0002),
-            ("34", 0.0002),
-            ("36", 0.0002),
-            ("38", 0.0002),
-            ("39", 0.0002),
-            ("41", 0.0002),
-            ("42", 0.0002),
-            ("43", 0.0002),
-            ("52", 0.0002),
-            ("57", 0.0002),
-            ("58", 0.0002),
-            ("59", 0.0002),
-            ("60", 0.0002),
-            ("83", 0.0002),
-            ("101", 0.0002),
-            ("113", 0.0002),
-            ("10150", 0.0002),
-            ("10151", 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(priority_frequency))
+    _priority_frequency = _sampler("PatientDiagnosisDataClass.priority", [
+        (None, 0.7034),
+        ("1", 0.076),
+        ("2", 0.053),
+        ("0", 0.034),
+        ("3", 0.022),
+        ("4", 0.0196),
+        ("5", 0.0152),
+        ("6", 0.0102),
+        ("8", 0.0096),
+        ("7", 0.009),
+        ("9", 0.0064),
+        ("11", 0.0044),
+        ("12", 0.0044),
+        ("10", 0.0032),
+        ("13", 0.0026),
+        ("99", 0.0024),
+        ("18400", 0.002),
+        ("14", 0.0018),
+        ("15", 0.0018),
+        ("16", 0.0018),
+        ("17", 0.0018),
+        ("19", 0.0016),
+        ("18", 0.0014),
+        ("-1", 0.0012),
+        ("20", 0.0012),
+        ("21", 0.0012),
+        ("25", 0.0008),
+        ("22", 0.0006),
+        ("23", 0.0006),
+        ("27", 0.0006),
+        ("24", 0.0004),
+        ("26", 0.0004),
+        ("28", 0.0004),
+        ("40", 0.0004),
+        ("10800", 0.0004),
+        ("29", 0.0002),
+        ("30", 0.0002),
+        ("31", 0.0002),
+        ("32", 0.0002),
+        ("34", 0.0002),
+        ("36", 0.0002),
+        ("38", 0.0002),
+        ("39", 0.0002),
+        ("41", 0.0002),
+        ("42", 0.0002),
+        ("43", 0.0002),
+        ("52", 0.0002),
+        ("57", 0.0002),
+        ("58", 0.0002),
+        ("59", 0.0002),
+        ("60", 0.0002),
+        ("83", 0.0002),
+        ("101", 0.0002),
+        ("113", 0.0002),
+        ("10150", 0.0002),
+        ("10151", 0.0002),
+    ])
     
-    def _type_frequency():
-        type_frequency = [
-            ("NULL", 0.394),
-            ("F", 0.16),
-            ("A", 0.1216),
-            ("W", 0.1154),
-            ("S", 0.0716),
-            ("U", 0.0586),
-            ("P", 0.0502),
-            ("R", 0.028),
-            ("D", 0.0006),
-        ]
-        return faker.random_element(elements=OrderedDict(type_frequency))
+    _type_frequency = _sampler("PatientDiagnosisDataClass.type", [
+        (None, 0.394),
+        ("F", 0.16),
+        ("A", 0.1216),
+        ("W", 0.1154),
+        ("S", 0.0716),
+        ("U", 0.0586),
+        ("P", 0.0502),
+        ("R", 0.028),
+        ("D", 0.0006),
+    ])
     
     id:str = field(default_factory=_uuid4)
     patient_id:str = field(default_factory=_uuid4)
@@ -437,6 +870,21 @@ class PatientDiagnosisDataClass(DataClassDF):
     priority:str = field(default_factory=_priority_frequency)
     type:str = field(default_factory=_type_frequency)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("patient_id", pa.string()),
+        ("description", pa.string()),
+        ("diagnosis_date", pa.date32()),
+        ("created_on", pa.date32()),
+        ("created_by", _CATEGORY),
+        ("data_source", pa.string()),
+        ("code", pa.string()),
+        ("patient_visit_id", pa.string()),
+        ("priority", pa.int32()),
+        ("type", _CATEGORY),
+    ])
+
+@_slotted
 @dataclass
 class PatientVisitPDSCareProviderDataClass(DataClassDF):
     id:str = field(default_factory=_uuid4)
@@ -444,16 +892,28 @@ class PatientVisitPDSCareProviderDataClass(DataClassDF):
     care_provider_id:str = field(default_factory=_uuid4)
     data_source:str = field(default_factory=_uuid4)
     created_on:datetime = field(default_factory=_past_date)
-    created_by:str = field(default="Null")
-    deleted_on:str = field(default="Null")
-    deleted_by:str = field(default="Null")
+    created_by:Optional[str] = field(default=None)
+    deleted_on:Optional[datetime] = field(default=None)
+    deleted_by:Optional[str] = field(default=None)
+
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("patient_visit_id", pa.string()),
+        ("care_provider_id", pa.string()),
+        ("data_source", pa.string()),
+        ("created_on", pa.date32()),
+        ("created_by", pa.string()),
+        ("deleted_on", pa.date32()),
+        ("deleted_by", pa.string()),
+    ])
     
+@_slotted
 @dataclass
 class PatientIdentDataClass(DataClassDF):
     id:str = field(default_factory=_uuid4) # varchar(36) PK 
     patient_id:str = field(default_factory=_uuid4) # varchar(36) 
     date_of_birth:datetime = field(default_factory=_past_date) # date 
-    type:str = field(default="NULL") # int(10) UN 
+    type:Optional[int] = field(default=None) # int(10) UN 
     created_on:datetime = field(default_factory=_past_date) # timestamp 
     data_source:str = field(default_factory=_uuid4) # varchar(36) 
     last_seen:datetime = field(default_factory=_past_date) # datetime 
@@ -461,76 +921,88 @@ class PatientIdentDataClass(DataClassDF):
     ssn_last4_salted:str = field(default_factory=faker.sha256) # varchar(48) 
     ssn_hash:str = field(default_factory=_uuid4) # binary(20) 
     ssn_last4_hash:str = field(default_factory=_uuid4) # binary(16) 
-    hash_key_id:str = field(default="NULL") # int(11)
+    hash_key_id:Optional[int] = field(default=None) # int(11)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("patient_id", pa.string()),
+        ("date_of_birth", pa.date32()),
+        ("type", pa.uint32()),
+        ("created_on", pa.date32()),
+        ("data_source", pa.string()),
+        ("last_seen", pa.date32()),
+        ("ssn_salted", pa.string()),
+        ("ssn_last4_salted", pa.string()),
+        ("ssn_hash", pa.string()),
+        ("ssn_last4_hash", pa.string()),
+        ("hash_key_id", pa.int32()),
+    ])
+
+@_slotted
 @dataclass
 class PatientVisitDetailsDataClass(DataClassDF):
-    def _type_frequency():
-        type_frequency = [
-            ("NULL", 0.948853615520282),
-            ("(blank)", 0.0141093474426808),
-            ("lab", 0.00377928949357521),
-            ("CHEST PAIN", 0.00251952632905014),
-            ("Back Pain", 0.00201562106324011),
-            ("Abd Pain", 0.0017636684303351),
-            ("screening", 0.0017636684303351),
-            ("Abdominal pain", 0.00151171579743008),
-            ("LOW BACK PAIN", 0.00125976316452507),
-            ("CLINIC", 0.00100781053162006),
-            ("COUGH", 0.00100781053162006),
-            ("FEVER", 0.00100781053162006),
-            ("headache", 0.00100781053162006),
-            ("OSA", 0.00100781053162006),
-            ("Priv", 0.00100781053162006),
-            ("SCREENING MAMMOGRAM", 0.00100781053162006),
-            ("xray", 0.00100781053162006),
-            ("Allscripts Order", 0.000755857898715042),
-            ("CONSULT", 0.000755857898715042),
-            ("COVID", 0.000755857898715042),
-            ("CP", 0.000755857898715042),
-            ("DYSPHAGIA", 0.000755857898715042),
-            ("Fall", 0.000755857898715042),
-            ("I10", 0.000755857898715042),
-            ("labs", 0.000755857898715042),
-            ("MVA", 0.000755857898715042),
-            ("MVC", 0.000755857898715042),
-            ("NEWBORN", 0.000755857898715042),
-            ("Newborn Delivery", 0.000755857898715042),
-            ("OP LAB", 0.000755857898715042),
-            ("Patient Questions", 0.000755857898715042),
-            ("PELVIC PAIN", 0.000755857898715042),
-            ("R53.1", 0.000755857898715042),
-            ("SKIN PROBLEM", 0.000755857898715042),
-            ("Weakness", 0.000755857898715042),
-            ("Z12.31", 0.000755857898715042),
-        ]
-        return faker.random_element(elements=OrderedDict(type_frequency))
+    _type_frequency = _sampler("PatientVisitDetailsDataClass.type", [
+        (None, 0.948853615520282),
+        ("(blank)", 0.0141093474426808),
+        ("lab", 0.00377928949357521),
+        ("CHEST PAIN", 0.00251952632905014),
+        ("Back Pain", 0.00201562106324011),
+        ("Abd Pain", 0.0017636684303351),
+        ("screening", 0.0017636684303351),
+        ("Abdominal pain", 0.00151171579743008),
+        ("LOW BACK PAIN", 0.00125976316452507),
+        ("CLINIC", 0.00100781053162006),
+        ("COUGH", 0.00100781053162006),
+        ("FEVER", 0.00100781053162006),
+        ("headache", 0.00100781053162006),
+        ("OSA", 0.00100781053162006),
+        ("Priv", 0.00100781053162006),
+        ("SCREENING MAMMOGRAM", 0.00100781053162006),
+        ("xray", 0.00100781053162006),
+        ("Allscripts Order", 0.000755857898715042),
+        ("CONSULT", 0.000755857898715042),
+        ("COVID", 0.000755857898715042),
+        ("CP", 0.000755857898715042),
+        ("DYSPHAGIA", 0.000755857898715042),
+        ("Fall", 0.000755857898715042),
+        ("I10", 0.000755857898715042),
+        ("labs", 0.000755857898715042),
+        ("MVA", 0.000755857898715042),
+        ("MVC", 0.000755857898715042),
+        ("NEWBORN", 0.000755857898715042),
+        ("Newborn Delivery", 0.000755857898715042),
+        ("OP LAB", 0.000755857898715042),
+        ("Patient Questions", 0.000755857898715042),
+        ("PELVIC PAIN", 0.000755857898715042),
+        ("R53.1", 0.000755857898715042),
+        ("SKIN PROBLEM", 0.000755857898715042),
+        ("Weakness", 0.000755857898715042),
+        ("Z12.31", 0.000755857898715042),
+    ])
     
-    def _admit_source_type():
-        admit_source_type_frequency = [
-            ("NULL", 0.4938),
-            ("9", 0.151),
-            ("10", 0.1116),
-            ("12", 0.0632),
-            ("1", 0.0626),
-            ("8", 0.0524),
-            ("2", 0.0246),
-            ("3", 0.0142),
-            ("31", 0.0074),
-            ("13", 0.0064),
-            ("0", 0.005),
-            ("7", 0.0018),
-            ("17", 0.0014),
-            ("4", 0.001),
-            ("11", 0.001),
-            ("25", 0.001),
-            ("16", 0.0006),
-            ("5", 0.0004),
-            ("21", 0.0002),
-            ("26", 0.0002),
-            ("30", 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(admit_source_type_frequency))
+    _admit_source_type = _sampler("PatientVisitDetailsDataClass.admit_source_type", [
+        (None, 0.4938),
+        ("9", 0.151),
+        ("10", 0.1116),
+        ("12", 0.0632),
+        ("1", 0.0626),
+        ("8", 0.0524),
+        ("2", 0.0246),
+        ("3", 0.0142),
+        ("31", 0.0074),
+        ("13", 0.0064),
+        ("0", 0.005),
+        ("7", 0.0018),
+        ("17", 0.0014),
+        ("4", 0.001),
+        ("11", 0.001),
+        ("25", 0.001),
+        ("16", 0.0006),
+        ("5", 0.0004),
+        ("21", 0.0002),
+        ("26", 0.0002),
+        ("30", 0.0002),
+    ])
 
     id:str = field(default_factory=_uuid4) # varchar(36) PK 
     note:str = field(default="") # text 
@@ -543,200 +1015,215 @@ class PatientVisitDetailsDataClass(DataClassDF):
     location:str = field(default_factory=_uuid4) # varchar(255) 
     location_label:str = field(default_factory=_uuid4) # varchar(255) 
     location_raw:str = field(default_factory=_uuid4) # varchar(255) 
-    last_seen:str = field(default_factory=_uuid4) # datetime 
-    presumed_discharge_date:str = field(default_factory=_uuid4) # datetime 
+    last_seen:datetime = field(default_factory=_past_date) # datetime 
+    presumed_discharge_date:datetime = field(default_factory=_past_date) # datetime 
     presumed_discharge_reason:str = field(default_factory=_uuid4) # varchar(255) 
     prior_patient_location:str = field(default_factory=_uuid4) # varchar(255) 
     admit_source_type:str = field(default_factory=_admit_source_type) # smallint(6)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("note", pa.string()),
+        ("note_privacy_level", pa.uint32()),
+        ("attending_physician", pa.string()),
+        ("chief_complaint", pa.string()),
+        ("discharge_diagnosis", pa.string()),
+        ("discharge_disposition_raw", pa.string()),
+        ("added_by", pa.string()),
+        ("location", pa.string()),
+        ("location_label", pa.string()),
+        ("location_raw", pa.string()),
+        ("last_seen", pa.date32()),
+        ("presumed_discharge_date", pa.date32()),
+        ("presumed_discharge_reason", pa.string()),
+        ("prior_patient_location", pa.string()),
+        ("admit_source_type", pa.int16()),
+    ])
+
+@_slotted
 @dataclass
 class FacilityIdentifierDataClass(DataClassDF):
-    def _type():
-        _type_frequency = [
-            ("NPI", 0.5056),
-            ("hl7", 0.316),
-            ("report", 0.0902),
-            ("pcc-facId", 0.028),
-            ("UHC_NPI", 0.0046),
-            ("UHC_TIN", 0.0044),
-            ("BCI_2021_ADDRESS_IDN", 0.0036),
-            ("BCI_2021_PRV_EXTERNAL_ID", 0.0036),
-            ("BCI_ADDRESS_IDN", 0.0036),
-            ("DHC_NPI", 0.0036),
-            ("BCI_PRV_NPIN", 0.0034),
-            ("BCI_PRV_EXTERNAL_ID", 0.0032),
-            ("direct-address", 0.0032),
-            ("NAT_UHC_NPI", 0.003),
-            ("pcc-orgId", 0.0028),
-            ("molina", 0.0024),
-            ("molina-hh", 0.0018),
-            ("pmg_clinic_id", 0.0014),
-            ("addus_homecare_pcs", 0.001),
-            ("providence_clinic_id", 0.001),
-            ("Regence _PRPR", 0.001),
-            ("tuality_id", 0.001),
-            ("BCBSMA_NPI", 0.0008),
-            ("H_SID", 0.0008),
-            ("MMIS_IDNTFR", 0.0008),
-            ("ProvID", 0.0008),
-            ("providence_clinic", 0.0006),
-            ("anthem_ca_HealthHome", 0.0004),
-            ("compass", 0.0004),
-            ("f_idents", 0.0004),
-            ("FLC Care Coordinator", 0.0004),
-            ("international_community_ichs", 0.0004),
-            ("molina_provider_clinic", 0.0004),
-            ("nh_healthy_families_npi2", 0.0004),
-            ("odds", 0.0004),
-            ("providence_clinic_region", 0.0004),
-            ("trillium_npi", 0.0004),
-            ("western_sky_tin", 0.0004),
-            ("amerigroup", 0.0002),
-            ("CCO", 0.0002),
-            ("centene_npi", 0.0002),
-            ("centene_tin", 0.0002),
-            ("cigna_pnw_cac_attribution", 0.0002),
-            ("GOBHI", 0.0002),
-            ("Healthpoint_Ochin", 0.0002),
-            ("King County BH Recovery NA", 0.0002),
-            ("la_clinica_child_portal", 0.0002),
-            ("mcinnis_facility", 0.0002),
-            ("MultCo Clinic", 0.0002),
-            ("ochin_pat_facility_relationship", 0.0002),
-            ("Parent Organization", 0.0002),
-            ("php_pod", 0.0002),
-            ("steward_child", 0.0002),
-            ("trillium_tin", 0.0002),
-            ("WVP_referral", 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(_type_frequency))
-    def _source_facility():
-        _source_facility_frequency = [
-            ("1", 0.969033856317093),
-            ("10", 0.00350949628406276),
-            ("78", 0.000412881915772089),
-            ("104", 0.00474814203137903),
-            ("697", 0.000412881915772089),
-            (_uuid4, 0.021882742),
-        ]
-        return faker.random_element(elements=OrderedDict(_source_facility_frequency))
+    _type = _sampler("FacilityIdentifierDataClass.type", [
+        ("NPI", 0.5056),
+        ("hl7", 0.316),
+        ("report", 0.0902),
+        ("pcc-facId", 0.028),
+        ("UHC_NPI", 0.0046),
+        ("UHC_TIN", 0.0044),
+        ("BCI_2021_ADDRESS_IDN", 0.0036),
+        ("BCI_2021_PRV_EXTERNAL_ID", 0.0036),
+        ("BCI_ADDRESS_IDN", 0.0036),
+        ("DHC_NPI", 0.0036),
+        ("BCI_PRV_NPIN", 0.0034),
+        ("BCI_PRV_EXTERNAL_ID", 0.0032),
+        ("direct-address", 0.0032),
+        ("NAT_UHC_NPI", 0.003),
+        ("pcc-orgId", 0.0028),
+        ("molina", 0.0024),
+        ("molina-hh", 0.0018),
+        ("pmg_clinic_id", 0.0014),
+        ("addus_homecare_pcs", 0.001),
+        ("providence_clinic_id", 0.001),
+        ("Regence _PRPR", 0.001),
+        ("tuality_id", 0.001),
+        ("BCBSMA_NPI", 0.0008),
+        ("H_SID", 0.0008),
+        ("MMIS_IDNTFR", 0.0008),
+        ("ProvID", 0.0008),
+        ("providence_clinic", 0.0006),
+        ("anthem_ca_HealthHome", 0.0004),
+        ("compass", 0.0004),
+        ("f_idents", 0.0004),
+        ("FLC Care Coordinator", 0.0004),
+        ("international_community_ichs", 0.0004),
+        ("molina_provider_clinic", 0.0004),
+        ("nh_healthy_families_npi2", 0.0004),
+        ("odds", 0.0004),
+        ("providence_clinic_region", 0.0004),
+        ("trillium_npi", 0.0004),
+        ("western_sky_tin", 0.0004),
+        ("amerigroup", 0.0002),
+        ("CCO", 0.0002),
+        ("centene_npi", 0.0002),
+        ("centene_tin", 0.0002),
+        ("cigna_pnw_cac_attribution", 0.0002),
+        ("GOBHI", 0.0002),
+        ("Healthpoint_Ochin", 0.0002),
+        ("King County BH Recovery NA", 0.0002),
+        ("la_clinica_child_portal", 0.0002),
+        ("mcinnis_facility", 0.0002),
+        ("MultCo Clinic", 0.0002),
+        ("ochin_pat_facility_relationship", 0.0002),
+        ("Parent Organization", 0.0002),
+        ("php_pod", 0.0002),
+        ("steward_child", 0.0002),
+        ("trillium_tin", 0.0002),
+        ("WVP_referral", 0.0002),
+    ])
+    _source_facility = _sampler("FacilityIdentifierDataClass.source_facility", [
+        ("1", 0.969033856317093),
+        ("10", 0.00350949628406276),
+        ("78", 0.000412881915772089),
+        ("104", 0.00474814203137903),
+        ("697", 0.000412881915772089),
+        (_uuid4, 0.021882742),
+    ])
 
     deleted_on_frequency = [
             (None, 0.8),
             (faker.past_date(), 0.2)
         ]
     id:str = field(default_factory=_uuid4) # varchar(36) PK
-    identifier:str = field(default_factory=_company) # varchar(255)
+    identifier:str = field(default_factory=_identifier) # varchar(255)
     type:str = field(default_factory=_type) # varchar(45)
     facility_id:str = field(default_factory=_uuid4) # varchar(36)
     source_facility_id:str = field(default_factory=_source_facility) # char(36)
     last_update:datetime = field(default=datetime(2000,1,1)) # timestamp
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("identifier", pa.string()),
+        ("type", _CATEGORY),
+        ("facility_id", pa.string()),
+        ("source_facility_id", pa.string()),
+        ("last_update", pa.timestamp("us")),
+    ])
+
+@_slotted
 @dataclass
 class Hl7MappingDataClass(DataClassDF):
-    def _name_():
-        _name_frequency = [
-            ("ENCOUNTER_FACILITY", 0.151866450266636),
-            ("ENCOUNTER_SERVICE", 0.118247159749594),
-            ("ENCOUNTER_CLASS", 0.0890331555761651),
-            ("ENCOUNTER_DISCHARGE_DISPOSITION", 0.0709482958497566),
-            ("ENCOUNTER_LOCATION_LABEL", 0.05170415024345),
-            ("ENCOUNTER_LOCATION", 0.0468351495478785),
-            ("ENCOUNTER_ADMIT_SOURCE", 0.0452121493160213),
-            ("ENCOUNTER_PATIENT_TYPE", 0.0347785763969395),
-            ("IGNORE_ENCOUNTER", 0.0250405750057964),
-            ("ENCOUNTER_DELETE", 0.0231857175979597),
-            ("PATIENT_MRN", 0.0217945745420821),
-            ("ALLERGY_SEVERITY", 0.0206352886621841),
-            ("CARE_PROVIDER_FILTER", 0.0201715743102249),
-            ("ENCOUNTER_CANCEL_DISCHARGE", 0.0169255738465105),
-            ("DIAGNOSIS_CODE_METHOD", 0.0162300023185718),
-            ("PATIENT_MRN_AUTHORITY_TO_USE", 0.0153025736146534),
-            ("ENCOUNTER_ACCOUNT", 0.0146070020867146),
-            ("CARE_PROVIDER_LAST_NAME", 0.014375144910735),
-            ("ENCOUNTER_REASON", 0.0141432877347554),
-            ("PATIENT_PHONE_TYPE", 0.0141432877347554),
-            ("DIAGNOSIS_NAME", 0.0139114305587758),
-            ("PATIENT_SEX", 0.0134477162068166),
-            ("CARE_PROVIDER_FIRST_NAME", 0.0129840018548574),
-            ("DIAGNOSIS_TYPE", 0.0125202875028982),
-            ("PATIENT_DEMOGRAPHIC_MARITAL_STATUS_CODE", 0.0118247159749594),
-            ("PATIENT_DEMOGRAPHIC_LANGUAGE_CODE", 0.0115928587989798),
-            ("PATIENT_DEMOGRAPHIC_ETHNICITY_CODE", 0.0111291444470206),
-            ("PROVIDER_SHOULD_NOTIFY_DEFAULT", 0.0106654300950614),
-            ("CARE_PROVIDER_NPI_IDENTIFIER", 0.00996985856712265),
-            ("CARE_PROVIDER_MIDDLE_NAME", 0.00973800139114306),
-            ("ENCOUNTER_ATTEND_PHYSICIAN_IDENTIFIER_TYPE", 0.00950614421516346),
-            ("PATIENT_DEMOGRAPHIC_RACE_CODE", 0.00950614421516346),
-            ("PROVIDER_NOTIFIED_BY_FACILITY_DEFAULT", 0.00834685833526548),
-            ("ALLERGY_TYPE", 0.00811500115928588),
-            ("ENCOUNTER_ATTEND_PHYSICIAN_ASSIGN_AUTH", 0.00741942963134709),
-            ("ENCOUNTER_CONSULT_PHYSICIAN_IDENTIFIER_TYPE", 0.00718757245536749),
-            ("ENCOUNTER_REFER_PHYSICIAN_IDENTIFIER_TYPE", 0.0069557152793879),
-        ]
-        return faker.random_element(elements=OrderedDict(_name_frequency))
-    def _segment():
-        _segment_frequency = [
-            ("PV1", 0.514629258517034),
-            ("PID", 0.109218436873747),
-            ("---", 0.103406813627255),
-            ("MSH", 0.0847695390781563),
-            ("PD1", 0.0525050100200401),
-            ("DG1", 0.0408817635270541),
-            ("AL1", 0.0270541082164329),
-            ("ROL", 0.0208416833667335),
-            ("NK1", 0.0130260521042084),
-            ("PV2", 0.012625250501002),
-            ("OBX", 0.00440881763527054),
-            ("IN1", 0.00340681362725451),
-            ("OBR", 0.0030060120240481),
-            ("ZPD", 0.00260521042084168),
-            ("NTE", 0.00240480961923848),
-            ("EVN", 0.00120240480961924),
-            ("ZP1", 0.00100200400801603),
-            ("CON", 0.000601202404809619),
-            ("DRG", 0.000601202404809619),
-            ("ZFA", 0.000601202404809619),
-            ("ZRV", 0.000601202404809619),
-            ("ZSD", 0.000601202404809619),
+    _name_ = _sampler("Hl7MappingDataClass.name", [
+        ("ENCOUNTER_FACILITY", 0.151866450266636),
+        ("ENCOUNTER_SERVICE", 0.118247159749594),
+        ("ENCOUNTER_CLASS", 0.0890331555761651),
+        ("ENCOUNTER_DISCHARGE_DISPOSITION", 0.0709482958497566),
+        ("ENCOUNTER_LOCATION_LABEL", 0.05170415024345),
+        ("ENCOUNTER_LOCATION", 0.0468351495478785),
+        ("ENCOUNTER_ADMIT_SOURCE", 0.0452121493160213),
+        ("ENCOUNTER_PATIENT_TYPE", 0.0347785763969395),
+        ("IGNORE_ENCOUNTER", 0.0250405750057964),
+        ("ENCOUNTER_DELETE", 0.0231857175979597),
+        ("PATIENT_MRN", 0.0217945745420821),
+        ("ALLERGY_SEVERITY", 0.0206352886621841),
+        ("CARE_PROVIDER_FILTER", 0.0201715743102249),
+        ("ENCOUNTER_CANCEL_DISCHARGE", 0.0169255738465105),
+        ("DIAGNOSIS_CODE_METHOD", 0.0162300023185718),
+        ("PATIENT_MRN_AUTHORITY_TO_USE", 0.0153025736146534),
+        ("ENCOUNTER_ACCOUNT", 0.0146070020867146),
+        ("CARE_PROVIDER_LAST_NAME", 0.014375144910735),
+        ("ENCOUNTER_REASON", 0.0141432877347554),
+        ("PATIENT_PHONE_TYPE", 0.0141432877347554),
+        ("DIAGNOSIS_NAME", 0.0139114305587758),
+        ("PATIENT_SEX", 0.0134477162068166),
+        ("CARE_PROVIDER_FIRST_NAME", 0.0129840018548574),
+        ("DIAGNOSIS_TYPE", 0.0125202875028982),
+        ("PATIENT_DEMOGRAPHIC_MARITAL_STATUS_CODE", 0.0118247159749594),
+        ("PATIENT_DEMOGRAPHIC_LANGUAGE_CODE", 0.0115928587989798),
+        ("PATIENT_DEMOGRAPHIC_ETHNICITY_CODE", 0.0111291444470206),
+        ("PROVIDER_SHOULD_NOTIFY_DEFAULT", 0.0106654300950614),
+        ("CARE_PROVIDER_NPI_IDENTIFIER", 0.00996985856712265),
+        ("CARE_PROVIDER_MIDDLE_NAME", 0.00973800139114306),
+        ("ENCOUNTER_ATTEND_PHYSICIAN_IDENTIFIER_TYPE", 0.00950614421516346),
+        ("PATIENT_DEMOGRAPHIC_RACE_CODE", 0.00950614421516346),
+        ("PROVIDER_NOTIFIED_BY_FACILITY_DEFAULT", 0.00834685833526548),
+        ("ALLERGY_TYPE", 0.00811500115928588),
+        ("ENCOUNTER_ATTEND_PHYSICIAN_ASSIGN_AUTH", 0.00741942963134709),
+        ("ENCOUNTER_CONSULT_PHYSICIAN_IDENTIFIER_TYPE", 0.00718757245536749),
+        ("ENCOUNTER_REFER_PHYSICIAN_IDENTIFIER_TYPE", 0.0069557152793879),
+    ])
+    _segment = _sampler("Hl7MappingDataClass.segment", [
+        ("PV1", 0.514629258517034),
+        ("PID", 0.109218436873747),
+        ("---", 0.103406813627255),
+        ("MSH", 0.0847695390781563),
+        ("PD1", 0.0525050100200401),
+        ("DG1", 0.0408817635270541),
+        ("AL1", 0.0270541082164329),
+        ("ROL", 0.0208416833667335),
+        ("NK1", 0.0130260521042084),
+        ("PV2", 0.012625250501002),
+        ("OBX", 0.00440881763527054),
+        ("IN1", 0.00340681362725451),
+        ("OBR", 0.0030060120240481),
+        ("ZPD", 0.00260521042084168),
+        ("NTE", 0.00240480961923848),
+        ("EVN", 0.00120240480961924),
+        ("ZP1", 0.00100200400801603),
+        ("CON", 0.000601202404809619),
+        ("DRG", 0.000601202404809619),
+        ("ZFA", 0.000601202404809619),
+        ("ZRV", 0.000601202404809619),
+        ("ZSD", 0.000601202404809619),
 
-        ]
-        return faker.random_element(elements=OrderedDict(_segment_frequency))
-    def _segment_iteration():
-        _segment_iteration_frequency = [
-            (None, 0.9794),
-            (0, 0.0182),
-            (1, 0.0008),
-            (2, 0.0006),
-            (10, 0.0004),
-            (14, 0.0004),
-            (3, 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(_segment_iteration_frequency))
-    def _field_():
-        _field_frequency = [
-            (3, 0.275),
-            (None, 0.2954),
-            (4, 0.1204),
-            (2, 0.1028),
-            (10, 0.0878),
-            (36, 0.0624),
-            (8, 0.0562),
-        ]
-        return faker.random_element(elements=OrderedDict(_field_frequency))
-    def _field_iteration():
-        _field_iteration_frequency = [
-            (0, 0.8224),
-            (None, 0.171),
-            (1, 0.0044),
-            (2, 0.0012),
-            (7, 0.0006),
-            (3, 0.0002),
-            (10, 0.0002),
-        ]
-        return faker.random_element(elements=OrderedDict(_field_iteration_frequency))
-    def _component():
-        _component_frequency = [
+    ])
+    _segment_iteration = _sampler("Hl7MappingDataClass.segment_iteration", [
+        (None, 0.9794),
+        (0, 0.0182),
+        (1, 0.0008),
+        (2, 0.0006),
+        (10, 0.0004),
+        (14, 0.0004),
+        (3, 0.0002),
+    ])
+    _field_ = _sampler("Hl7MappingDataClass.field", [
+        (3, 0.275),
+        (None, 0.2954),
+        (4, 0.1204),
+        (2, 0.1028),
+        (10, 0.0878),
+        (36, 0.0624),
+        (8, 0.0562),
+    ])
+    _field_iteration = _sampler("Hl7MappingDataClass.field_iteration", [
+        (0, 0.8224),
+        (None, 0.171),
+        (1, 0.0044),
+        (2, 0.0012),
+        (7, 0.0006),
+        (3, 0.0002),
+        (10, 0.0002),
+    ])
+    _component = _sampler("Hl7MappingDataClass.component", [
 			(0, 0.6742),
 			(None, 0.1198),
 			(1, 0.085),
@@ -752,27 +1239,21 @@ class Hl7MappingDataClass(DataClassDF):
 			(9, 0.0002),
 			(10, 0.0002),
 			(14, 0.0002),
-		]
-        return faker.random_element(elements=OrderedDict(_component_frequency))
-    def _subcomponent():
-        _subcomponent_frequency = [
+    ])
+    _subcomponent = _sampler("Hl7MappingDataClass.subcomponent", [
 			(None, 0.8762),
 			(1, 0.0772),
 			(0, 0.0462),
 			(5, 0.0002),
 			(7, 0.0002),
-		]
-        return faker.random_element(elements=OrderedDict(_subcomponent_frequency))
-    def _deleted_by():
-        _deleted_by_frequency = [
+    ])
+    _deleted_by = _sampler("Hl7MappingDataClass.deleted_by", [
 			(None, 0.64),
 			(_uuid4, .2586),
-			(1, 0.0126),
-		]
-        return faker.random_element(elements=OrderedDict(_deleted_by_frequency))
-    def _translation():
-        _translation_frequency = [
-			('NULL', 0.448986602542082),
+			("1", 0.0126),
+    ])
+    _translation = _sampler("Hl7MappingDataClass.translation", [
+			(None, 0.448986602542082),
 			('{1":"1"', 0.0436276193747853),
 			('{I":"2"', 0.0398488491927173),
 			('{(?i).*ABORTION.*": "247"', 0.0364136035726554),
@@ -809,11 +1290,9 @@ class Hl7MappingDataClass(DataClassDF):
 			('{AMA":"7"', 0.00480934386808657),
 			('a', 0.00480934386808657),
 			('{CLI":"12"', 0.00446581930608038),
-		]
-        return faker.random_element(elements=OrderedDict(_translation_frequency))
-    def _default_value():
-        _default_value_frequency = [
-			('NULL', 0.617338487023744),
+    ])
+    _default_value = _sampler("Hl7MappingDataClass.default_value", [
+			(None, 0.617338487023744),
 			(' "(?i).*EMERGENCY.*": "0"', 0.0369961347321922),
 			('2:"2"', 0.0323025952512424),
 			('O:"3"', 0.0311982330204307),
@@ -857,10 +1336,8 @@ class Hl7MappingDataClass(DataClassDF):
 			('AMH:"amh"', 0.00193263390392049),
 			('HOME:"8"', 0.00193263390392049),
 			('IP:"2"', 0.00193263390392049),
-		]
-        return faker.random_element(elements=OrderedDict(_default_value_frequency))
-    def _map_all_field_iterations():
-        _map_all_field_iterations_frequency = [
+    ])
+    _map_all_field_iterations = _sampler("Hl7MappingDataClass.map_all_field_iterations", [
 			('0', 0.600890620651266),
 			('1', 0.0553854717506262),
 			('3:"3"', 0.0370164208182577),
@@ -869,7 +1346,7 @@ class Hl7MappingDataClass(DataClassDF):
 			('P:"1"', 0.0295018090731979),
 			(' "(?i).*IMMEDIATE CARE.*": "3"', 0.0253270247703869),
 			('MILD:"1"', 0.0217088783746173),
-			('NULL', 0.0217088783746173),
+			(None, 0.0217088783746173),
 			('W:"WPN"', 0.0153075424436404),
 			(' "I9": "I9"', 0.0150292234901197),
 			('F:"2"', 0.0147509045365989),
@@ -892,10 +1369,8 @@ class Hl7MappingDataClass(DataClassDF):
 			('LAW:"14"', 0.00333982744224882),
 			('AMA:"7"', 0.00306150848872808),
 			('CAR:"40"', 0.00278318953520735),
-		]
-        return faker.random_element(elements=OrderedDict(_map_all_field_iterations_frequency))
-    def _use_regex():
-        _use_regex_frequency = [
+    ])
+    _use_regex = _sampler("Hl7MappingDataClass.use_regex", [
 			('0', 0.674625208217657),
 			('4:"4"', 0.0330372015546918),
 			('E:"0"', 0.0327595780122154),
@@ -903,7 +1378,7 @@ class Hl7MappingDataClass(DataClassDF):
 			(' "(?i)^ED$": "0"', 0.0294280955024986),
 			(' "(?i).*URGENT CARE.*": "3"', 0.0252637423653526),
 			('SV:"4"', 0.0224875069405886),
-			('NULL', 0.0208217656857301),
+			(None, 0.0208217656857301),
 			('HOME:"PRN"', 0.0152692948362021),
 			('FEMALE:"2"', 0.0147140477512493),
 			(' "IA": "I10"', 0.0127706829539145),
@@ -928,11 +1403,9 @@ class Hl7MappingDataClass(DataClassDF):
 			(' "(?i).*SURGERY.*": "33"', 0.00222098833981122),
 			(' "I10": "I10"', 0.00222098833981122),
 			('AAGASTRO:"MD_1154311017"', 0.00222098833981122),
-		]
-        return faker.random_element(elements=OrderedDict(_use_regex_frequency))
-    def _hl7_groovy_script_id():
-        _hl7_groovy_script_id_frequency = [
-			('NULL', 0.66993006993007),
+    ])
+    _hl7_groovy_script_id = _sampler("Hl7MappingDataClass.hl7_groovy_script_id", [
+			(None, 0.66993006993007),
 			('0', 0.0422377622377622),
 			(' "(?i).*ADVANCED WOUND CARE.*": "38"', 0.0296503496503497),
 			(' "(?i)^ED .*": "0"', 0.0296503496503497),
@@ -964,11 +1437,9 @@ class Hl7MappingDataClass(DataClassDF):
 			('E:"20"', 0.00223776223776224),
 			('ICU:"24"', 0.00223776223776224),
 			('LCHC:"or_1114978582"', 0.00223776223776224),
-		]
-        return faker.random_element(elements=OrderedDict(_hl7_groovy_script_id_frequency))
-    def _group_name():
-        _group_name_frequency = [
-			('NULL', 0.630748299319728),
+    ])
+    _group_name = _sampler("Hl7MappingDataClass.group_name", [
+			(None, 0.630748299319728),
 			('CARE_PROVIDER_LIST', 0.0571428571428571),
 			('0', 0.0348299319727891),
 			('6:"6"', 0.0318367346938776),
@@ -1000,12 +1471,10 @@ class Hl7MappingDataClass(DataClassDF):
 			('6:"13"', 0.0019047619047619),
 			('7:"1"', 0.0019047619047619),
 			('9:"-1"', 0.0019047619047619),
-		]
-        return faker.random_element(elements=OrderedDict(_group_name_frequency))
-    def _ignore_unmapped():
-        _ignore_unmapped_frequency = [
+    ])
+    _ignore_unmapped = _sampler("Hl7MappingDataClass.ignore_unmapped", [
 			('0', 0.67956698240866),
-			('NULL', 0.0600811907983762),
+			(None, 0.0600811907983762),
 			('7:"7"', 0.0313937753721245),
 			(' "(?i).* ED .*": "0"', 0.0286874154262517),
 			(' "(?i).*ALZHEIMERS.*": "216"', 0.0286874154262517),
@@ -1036,8 +1505,7 @@ class Hl7MappingDataClass(DataClassDF):
 			('AMA:"7"', 0.00216508795669824),
 			('CARE_PROVIDER_LIST', 0.00216508795669824),
 			('OHSUR:"OHSU RICHMOND FM"', 0.00216508795669824),
-		]
-        return faker.random_element(elements=OrderedDict(_ignore_unmapped_frequency))
+    ])
 
     id:str = field(default_factory=_uuid4) # char(36) PK 
     facility_id:str = field(default_factory=_uuid4) # char(36) 
@@ -1048,9 +1516,9 @@ class Hl7MappingDataClass(DataClassDF):
     field_iteration:str = field(default_factory=_field_iteration) # tinyint(4) 
     component:str = field(default_factory=_component) # tinyint(4) 
     subcomponent:str = field(default_factory=_subcomponent) # tinyint(4) 
-    created_on:str = field(default_factory=_past_date) # datetime 
+    created_on:datetime = field(default_factory=_past_date) # datetime 
     created_by:str = field(default_factory=_uuid4) # char(36) 
-    deleted_on:str = field(default_factory=_past_date) # datetime 
+    deleted_on:datetime = field(default_factory=_past_date) # datetime 
     deleted_by:str = field(default_factory=_deleted_by) # char(36) 
     translation:str = field(default_factory=_translation) # mediumtext 
     default_value:str = field(default_factory=_default_value) # char(36) 
@@ -1060,29 +1528,65 @@ class Hl7MappingDataClass(DataClassDF):
     group_name:str = field(default_factory=_group_name) # varchar(45) 
     ignore_unmapped:str = field(default_factory=_ignore_unmapped) # tinyint(1)
 
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("facility_id", pa.string()),
+        ("name", _CATEGORY),
+        ("segment", _CATEGORY),
+        ("segment_iteration", pa.int8()),
+        ("_field", pa.int8()),
+        ("field_iteration", pa.int8()),
+        ("component", pa.int8()),
+        ("subcomponent", pa.int8()),
+        ("created_on", pa.date32()),
+        ("created_by", pa.string()),
+        ("deleted_on", pa.date32()),
+        ("deleted_by", pa.string()),
+        ("translation", pa.string()),
+        ("default_value", pa.string()),
+        ("map_all_field_iterations", pa.string()),
+        ("use_regex", pa.string()),
+        ("hl7_groovy_script_id", pa.string()),
+        ("group_name", _CATEGORY),
+        ("ignore_unmapped", pa.string()),
+    ])
+
+@_slotted
 @dataclass
 class DxCodeDataClass(DataClassDF):
-    def _method():
-        _method_frequency = [
+    _method = _sampler("DxCodeDataClass.method", [
 			('I10', 0.814),
 			('SNM', 0.186),
-		]
-        return faker.random_element(elements=OrderedDict(_method_frequency))
-    def _is_billable():
-        _is_billable_frequency = [
+    ])
+    _is_billable = _sampler("DxCodeDataClass.is_billable", [
 			('1', 0.6542),
 			(None, 0.186),
 			('0', 0.1598),
-		]
-        return faker.random_element(elements=OrderedDict(_is_billable_frequency))
+    ])
+    def _description():
+        return faker.sentence(nb_words=15)
+    _register_batch(_description, _faker_pool("sentence", nb_words=15))
 
     id:str = field(default_factory=_uuid4) # varchar(36) PK
     code:str = field(default_factory=_int) # varchar(45)
     method:str = field(default_factory=_method) # varchar(12)
-    description:str = field(default_factory=faker.sentence(nb_words=15)) # varchar(255)
-    wa_non_emergent:str = field(default=0) # tinyint(1)
-    status:str = field(default=None) # varchar(255)
-    version:str = field(default=None) # varchar(255)
-    created_on:str = field(default_factory=_past_date) # timestamp
-    modified_on:str = field(default_factory=_past_date) # timestamp
+    description:str = field(default_factory=_description) # varchar(255)
+    wa_non_emergent:int = field(default=0) # tinyint(1)
+    status:Optional[str] = field(default=None) # varchar(255)
+    version:Optional[str] = field(default=None) # varchar(255)
+    created_on:datetime = field(default_factory=_past_date) # timestamp
+    modified_on:datetime = field(default_factory=_past_date) # timestamp
     is_billable:str = field(default_factory=_is_billable) # bit(1)
+
+    arrow_schema = pa.schema([
+        ("id", pa.string()),
+        ("code", pa.string()),
+        ("method", _CATEGORY),
+        ("description", pa.string()),
+        ("wa_non_emergent", pa.int8()),
+        ("status", pa.string()),
+        ("version", pa.string()),
+        ("created_on", pa.date32()),
+        ("modified_on", pa.date32()),
+        ("is_billable", pa.bool_()),
+    ])
@@ -0,0 +1,220 @@
+import argparse
+import inspect
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List
+import numpy as np
+import pyarrow as pa
+from synthetic_data import DataGenClasses
+from synthetic_data.DataGenClasses import DataClassDF
+from synthetic_data.parquet_gen import DEFAULT_ROW_GROUP_SIZE, generate_batches, write_parquet
+
+'''
+Measures how fast each DataGenClasses table generates, asv style: every (class, path, size) case
+runs in its own process (forked where the platform supports it, spawned on Windows) and reports
+rows/sec, bytes/sec and the peak RSS it added.
+
+    python -m synthetic_data.benchmark --sizes 1000 100000 --output benchmark_results/after.json
+    python -m synthetic_data.benchmark --compare benchmark_results/before.json
+
+Paths:
+    row      instantiate one dataclass per row, then to_arrow() the list (bytes = Arrow buffers)
+    batch    generate_batches() one row group at a time without writing (bytes = Arrow buffers)
+    parquet  generate_batches() streamed through write_parquet() (bytes = file size)
+
+The row path builds every instance in memory, so it is skipped above --max-row-path-rows.
+Results are written as JSON named after the current commit so runs can be compared across commits.
+'''
+
+PATHS = ("row", "batch", "parquet")
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+DEFAULT_MAX_ROW_PATH_ROWS = 100_000
+
+
+def data_classes() -> Dict[str, type]:
+    """Every generator class in DataGenClasses, by name."""
+    return {
+        name: member for name, member in inspect.getmembers(DataGenClasses, inspect.isclass)
+        if issubclass(member, DataClassDF) and member is not DataClassDF
+    }
+
+
+def _rss() -> int:
+    """Current resident set size in bytes, falling back to the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return _peak_rss()
+
+
+def _peak_rss() -> int:
+    """Peak resident set size in bytes, or 0 where it can't be measured."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no getrusage, but psutil (installed with dask) reports the peak working set
+        try:
+            import psutil
+        except ImportError:
+            return 0
+        return psutil.Process().memory_info().peak_wset
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(data_class:type, path:str, n_rows:int, row_group_size:int, output_dir:str) -> dict:
+    rss_start = _rss()
+    start = perf_counter()
+    if path == "row":
+        n_bytes = data_class.to_arrow(data_class() for _ in range(n_rows)).nbytes
+    elif path == "batch":
+        n_bytes = sum(batch.nbytes for batch in generate_batches(data_class, n_rows, row_group_size, seed=0))
+    else:
+        parquet_path = os.path.join(output_dir, f"{data_class.__name__}.parquet")
+        write_parquet(generate_batches(data_class, n_rows, row_group_size, seed=0), parquet_path)
+        n_bytes = os.path.getsize(parquet_path)
+        os.remove(parquet_path)
+    seconds = perf_counter() - start
+    return {
+        "class": data_class.__name__,
+        "path": path,
+        "rows": n_rows,
+        "seconds": seconds,
+        "rows_per_sec": n_rows / seconds,
+        "bytes": n_bytes,
+        "bytes_per_sec": n_bytes / seconds,
+        "peak_memory_bytes": max(_peak_rss() - rss_start, 0),
+    }
+
+
+def _case_process(conn, data_class:type, *args) -> None:
+    try:
+        # A spawned process inherits nothing, so the pools and frequency tables are built before timing
+        data_class.generate(10, seed=0)
+        data_class()
+        conn.send(_run_case(data_class, *args))
+    except BaseException as e:
+        conn.send({"error": repr(e)})
+    finally:
+        conn.close()
+
+
+def run_benchmarks(
+        classes:List[str],
+        sizes:List[int],
+        paths:List[str],
+        row_group_size:int=DEFAULT_ROW_GROUP_SIZE,
+        max_row_path_rows:int=DEFAULT_MAX_ROW_PATH_ROWS,
+        repeat:int=1,
+    ) -> List[dict]:
+    """Runs every case, keeping the fastest of `repeat` runs, and prints one line per case."""
+    available = data_classes()
+    # The faker pools and frequency tables are built once here and inherited by every forked case,
+    # so their one-off cost is not counted against whichever case happens to run first
+    for name in classes:
+        available[name].generate(10, seed=0)
+        available[name]()
+
+    # fork is unavailable on Windows, where each case is spawned instead
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name in classes:
+            for n_rows in sizes:
+                for path in paths:
+                    if path == "row" and n_rows > max_row_path_rows:
+                        continue
+                    runs = []
+                    for _ in range(repeat):
+                        parent_conn, child_conn = context.Pipe(duplex=False)
+                        process = context.Process(
+                            target=_case_process, args=(child_conn, available[name], path, n_rows, row_group_size, output_dir)
+                        )
+                        process.start()
+                        child_conn.close()
+                        run = parent_conn.recv()
+                        process.join()
+                        if "error" in run:
+                            raise RuntimeError(f"{name} {path} {n_rows} rows failed: {run['error']}")
+                        runs.append(run)
+                    result = min(runs, key=lambda run: run["seconds"])
+                    results.append(result)
+                    print(
+                        f"{name:<38} {path:<8} {n_rows:>11,} rows  {result['rows_per_sec']:>13,.0f} rows/s  "
+                        f"{result['bytes_per_sec'] / 2**20:>9,.1f} MiB/s  {result['peak_memory_bytes'] / 2**20:>9,.1f} MiB peak"
+                    )
+    return results
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results:List[dict], baseline:List[dict], threshold:float) -> int:
+    """Prints the rows/sec change against `baseline` per case and returns the number of regressions."""
+    baseline_cases = {(run["class"], run["path"], run["rows"]): run for run in baseline}
+    regressions = 0
+    for run in results:
+        before = baseline_cases.get((run["class"], run["path"], run["rows"]))
+        if before is None:
+            continue
+        ratio = run["rows_per_sec"] / before["rows_per_sec"]
+        regressed = ratio < 1 - threshold
+        regressions += regressed
+        print(f"{run['class']:<38} {run['path']:<8} {run['rows']:>11,} rows  {ratio:>6.2f}x{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DataGenClasses generation throughput.")
+    parser.add_argument("--classes", nargs="+", choices=sorted(data_classes()), default=sorted(data_classes()))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--max-row-path-rows", type=int, default=DEFAULT_MAX_ROW_PATH_ROWS)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, the fastest is kept")
+    parser.add_argument("--output", default=None, help="defaults to benchmark_results/<commit>.json")
+    parser.add_argument("--compare", default=None, help="a previous results file to compare rows/sec against")
+    parser.add_argument("--regression-threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    commit = _commit()
+    results = run_benchmarks(args.classes, args.sizes, args.paths, args.row_group_size, args.max_row_path_rows, args.repeat)
+    output = args.output or os.path.join("benchmark_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "machine": {
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pyarrow": pa.__version__,
+            },
+            "row_group_size": args.row_group_size,
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.regression_threshold)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,156 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Type
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from synthetic_data import DataGenClasses
+from synthetic_data.DataGenClasses import DataClassDF
+
+'''
+Streams DataGenClasses tables to parquet one row group at a time so a table never has to be held
+in memory as a list of dicts or a DataFrame.
+
+    batches = generate_batches(PatientVisitDataClass, 10_000_000, seed=42)
+    write_parquet(batches, "data/patient_visit.parquet")
+
+Larger tables can be split into parquet shards generated in parallel with `write_sharded`, or from
+the repository root with `python -m synthetic_data.parquet_gen PatientVisitDataClass 100000000 data/patient_visit --seed 42`.
+'''
+
+DEFAULT_ROW_GROUP_SIZE = 100_000
+DEFAULT_ROWS_PER_SHARD = 1_000_000
+
+
+def batch_seed(seed:Optional[int], batch_index:int) -> np.random.SeedSequence:
+    """Seed for one row group, derived only from the run seed and the row group's position."""
+    return np.random.SeedSequence(entropy=seed, spawn_key=(batch_index,))
+
+
+def generate_batches(
+        data_class:Type[DataClassDF],
+        n_rows:int,
+        row_group_size:int=DEFAULT_ROW_GROUP_SIZE,
+        seed:Optional[int]=None,
+        first_batch_index:int=0,
+        key_format:str="uuid",
+        as_of:Optional[date]=None,
+        **overrides
+    ) -> Iterator[pa.Table]:
+    """
+    Yields `data_class` rows as pyarrow Tables of at most `row_group_size` rows.
+
+    Overrides work as in `DataClassDF.generate`. Array overrides must have length `n_rows` and
+    are sliced to match each batch. `first_batch_index` offsets the row group positions used for
+    seeding, so a shard seeds its row groups exactly as a single unsharded run would. With
+    `key_format="int64"` the same position gives each row group its own range of dense ids.
+    Dates are drawn relative to `as_of`, today by default.
+    """
+    for batch_index, start in enumerate(range(0, n_rows, row_group_size), start=first_batch_index):
+        stop = min(start + row_group_size, n_rows)
+        batch_overrides = {
+            name: value[start:stop] if isinstance(value, (list, np.ndarray, pa.Array, pa.ChunkedArray)) else value
+            for name, value in overrides.items()
+        }
+        yield data_class.generate(
+            stop - start,
+            seed=batch_seed(seed, batch_index),
+            key_format=key_format,
+            key_offset=batch_index * row_group_size,
+            as_of=as_of,
+            **batch_overrides
+        )
+
+
+def write_parquet(batches:Iterable[pa.Table], path:str, schema:Optional[pa.Schema]=None) -> int:
+    """Writes each batch as its own row group and returns the number of rows written."""
+    writer = None
+    row_count = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                schema = schema or batch.schema
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(batch.cast(schema), row_group_size=max(batch.num_rows, 1))
+            row_count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
+
+
+def _write_shard(data_class:Type[DataClassDF], path:str, n_rows:int, row_group_size:int, seed:int, first_batch_index:int, key_format:str, as_of:Optional[date], overrides:dict) -> int:
+    batches = generate_batches(data_class, n_rows, row_group_size, seed=seed, first_batch_index=first_batch_index, key_format=key_format, as_of=as_of, **overrides)
+    return write_parquet(batches, path)
+
+
+def write_sharded(
+        data_class:Type[DataClassDF],
+        n_rows:int,
+        output_dir:str,
+        seed:int,
+        rows_per_shard:int=DEFAULT_ROWS_PER_SHARD,
+        row_group_size:int=DEFAULT_ROW_GROUP_SIZE,
+        max_workers:Optional[int]=None,
+        key_format:str="uuid",
+        as_of:Optional[date]=None,
+        **overrides
+    ) -> List[str]:
+    """
+    Generates `n_rows` rows across worker processes as `part-NNNNN.parquet` files in `output_dir`.
+
+    Shard boundaries depend only on `rows_per_shard` and every row group is seeded from `seed` and
+    its position in the table, so a given seed writes byte-identical files for any `max_workers`.
+    Dates are drawn relative to `as_of`, today by default, so fix it to reproduce the files on
+    another day. Returns the shard paths in row order.
+    """
+    if rows_per_shard % row_group_size:
+        raise ValueError(f"rows_per_shard ({rows_per_shard}) must be a multiple of row_group_size ({row_group_size})")
+    os.makedirs(output_dir, exist_ok=True)
+    batches_per_shard = rows_per_shard // row_group_size
+    paths = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for shard_index, start in enumerate(range(0, n_rows, rows_per_shard)):
+            stop = min(start + rows_per_shard, n_rows)
+            shard_overrides = {
+                name: value[start:stop] if isinstance(value, (list, np.ndarray, pa.Array, pa.ChunkedArray)) else value
+                for name, value in overrides.items()
+            }
+            path = os.path.join(output_dir, f"part-{shard_index:05d}.parquet")
+            futures.append(executor.submit(
+                _write_shard, data_class, path, stop - start, row_group_size, seed, shard_index * batches_per_shard, key_format, as_of, shard_overrides
+            ))
+            paths.append(path)
+        for future in futures:
+            future.result()
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a DataGenClasses table as sharded parquet files.")
+    parser.add_argument("data_class", help="e.g. PatientVisitDataClass")
+    parser.add_argument("n_rows", type=int)
+    parser.add_argument("output_dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows-per-shard", type=int, default=DEFAULT_ROWS_PER_SHARD)
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    parser.add_argument("--key-format", choices=DataGenClasses.KEY_FORMATS, default="uuid")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="YYYY-MM-DD dates are drawn relative to, defaults to today")
+    args = parser.parse_args()
+
+    paths = write_sharded(
+        getattr(DataGenClasses, args.data_class),
+        args.n_rows,
+        args.output_dir,
+        seed=args.seed,
+        rows_per_shard=args.rows_per_shard,
+        row_group_size=args.row_group_size,
+        max_workers=args.workers,
+        key_format=args.key_format,
+        as_of=args.as_of,
+    )
+    print(f"Wrote {len(paths)} shards to {args.output_dir}")
@@ -0,0 +1,223 @@
+import argparse
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from synthetic_data.DataGenClasses import (
+    CategoricalSampler,
+    FacilityDataClass,
+    ComprehensiveEncounterDataClass,
+    PatientVisitDataClass,
+    ComprehensiveEncounterMapDataClass,
+    PatientDiagnosisDataClass,
+    PatientVisitPDSCareProviderDataClass,
+    PatientVisitDetailsDataClass,
+    PatientLanguageDataClass,
+    PatientDisabilityDataClass,
+    PatientMaritalDataClass,
+    PatientRaceDataClass,
+    PatientEthnicityDataClass,
+    KEY_FORMATS,
+    _key_batch,
+)
+from synthetic_data.parquet_gen import batch_seed
+
+'''
+Generates the tables in main.py's `data_locations` with valid key relationships, so joins between
+them match like production data instead of on independent random uuids.
+
+Rows are generated top down, a chunk of patients at a time:
+
+    facility
+      -> patient (ids only, each with a home facility)
+         -> PatientLanguage / PatientDisability / PatientMarital / PatientRace / PatientEthnicity
+         -> comprehensive_encounter
+            -> patient_visit, patient_visit_details, comprehensive_encounter_map
+               -> patient_diagnosis, patient_visit_pds_care_provider
+
+Each fan-out is either a fixed count or a (count, weight) frequency table. Keys can be written as
+uuid strings, 16 byte binary or dense int64 surrogates (see DataGenClasses.KEY_FORMATS) to compare
+the storage and join cost of wide string keys.
+'''
+
+FanOut = Union[int, List[Tuple[int, float]]]
+
+# Table name -> generator class, named as in main.py's data_locations
+PATIENT_TABLES = {
+    "PatientLanguage": PatientLanguageDataClass,
+    "PatientDisability": PatientDisabilityDataClass,
+    "PatientMarital": PatientMaritalDataClass,
+    "PatientRace": PatientRaceDataClass,
+    "PatientEthnicity": PatientEthnicityDataClass,
+}
+
+
+@dataclass
+class SchemaConfig():
+    facilities:int = 100
+    patients:int = 100_000
+    # Zipf exponent for how patients are spread over facilities, 0 spreads them evenly
+    facility_skew:float = 1.0
+    encounters_per_patient:FanOut = field(default_factory=lambda: [(1, 0.55), (2, 0.2), (3, 0.1), (4, 0.06), (6, 0.05), (10, 0.04)])
+    visits_per_encounter:FanOut = field(default_factory=lambda: [(1, 0.6), (2, 0.2), (3, 0.15), (5, 0.05)])
+    diagnoses_per_visit:FanOut = field(default_factory=lambda: [(0, 0.2), (1, 0.3), (2, 0.25), (4, 0.15), (8, 0.1)])
+    care_providers_per_visit:FanOut = field(default_factory=lambda: [(1, 0.7), (2, 0.25), (3, 0.05)])
+    patients_per_batch:int = 50_000
+    key_format:str = "uuid"
+
+
+class _FanOutSampler():
+
+    def __init__(self, fan_out:FanOut) -> None:
+        self._fixed = fan_out if isinstance(fan_out, int) else None
+        self._sampler = None if isinstance(fan_out, int) else CategoricalSampler(fan_out)
+
+    def counts(self, n:int, rng:np.random.Generator) -> np.ndarray:
+        if self._sampler is None:
+            return np.full(n, self._fixed, dtype=np.int64)
+        return self._sampler.batch(n, rng).astype(np.int64)
+
+
+def _children(parent_ids:pa.Array, counts:np.ndarray) -> Tuple[np.ndarray, pa.Array]:
+    """Parent position and parent id for every child row, given each parent's child count."""
+    parent_index = np.repeat(np.arange(len(counts)), counts)
+    return parent_index, parent_ids.take(pa.array(parent_index))
+
+
+def generate_schema(config:Optional[SchemaConfig]=None, seed:int=0) -> Iterator[Dict[str, pa.Table]]:
+    """
+    Yields {table name: pyarrow Table} for the facility table and then for each chunk of
+    `config.patients_per_batch` patients. Every batch is seeded from `seed` and its position.
+    """
+    config = config or SchemaConfig()
+    encounters_per_patient = _FanOutSampler(config.encounters_per_patient)
+    visits_per_encounter = _FanOutSampler(config.visits_per_encounter)
+    diagnoses_per_visit = _FanOutSampler(config.diagnoses_per_visit)
+    care_providers_per_visit = _FanOutSampler(config.care_providers_per_visit)
+
+    # Running row counts per table, so int64 ids stay dense across batches
+    key_offsets = defaultdict(int)
+    def generate(table_name, data_class, n, **kwargs):
+        table = data_class.generate(n, key_format=config.key_format, key_offset=key_offsets[table_name], **kwargs)
+        key_offsets[table_name] += n
+        return table
+
+    facility = generate("facility", FacilityDataClass, config.facilities, seed=batch_seed(seed, 0))
+    facility_ids = facility.column("id").combine_chunks()
+    facility_weights = 1 / np.arange(1, config.facilities + 1) ** config.facility_skew
+    facility_weights /= facility_weights.sum()
+    yield {"facility": facility}
+
+    for batch_index, start in enumerate(range(0, config.patients, config.patients_per_batch), start=1):
+        n_patients = min(config.patients_per_batch, config.patients - start)
+        seeds = iter(batch_seed(seed, batch_index).spawn(16))
+        rng = np.random.default_rng(next(seeds))
+        tables = {}
+
+        # Keys get their own stream so the fan-out draws, and row counts, don't depend on key_format
+        patient_ids = _key_batch(config.key_format, n_patients, np.random.default_rng(next(seeds)), key_offsets["patient"])
+        key_offsets["patient"] += n_patients
+        home_facility_ids = facility_ids.take(pa.array(rng.choice(config.facilities, size=n_patients, p=facility_weights)))
+        for table_name, data_class in PATIENT_TABLES.items():
+            tables[table_name] = generate(
+                table_name, data_class, n_patients, seed=next(seeds), patient_id=patient_ids, facility_id=home_facility_ids
+            )
+
+        encounter_patient, encounter_patient_ids = _children(patient_ids, encounters_per_patient.counts(n_patients, rng))
+        comprehensive_encounter = generate(
+            "comprehensive_encounter",
+            ComprehensiveEncounterDataClass,
+            len(encounter_patient),
+            seed=next(seeds),
+            patient_id=encounter_patient_ids,
+            facility_id=home_facility_ids.take(pa.array(encounter_patient)),
+        )
+        tables["comprehensive_encounter"] = comprehensive_encounter
+
+        encounter_ids = comprehensive_encounter.column("id").combine_chunks()
+        visit_encounter, visit_encounter_ids = _children(encounter_ids, visits_per_encounter.counts(len(encounter_ids), rng))
+        visit_patient_ids = encounter_patient_ids.take(pa.array(visit_encounter))
+        patient_visit = generate(
+            "patient_visit",
+            PatientVisitDataClass,
+            len(visit_encounter),
+            seed=next(seeds),
+            patient_id=visit_patient_ids,
+            facility_id=comprehensive_encounter.column("facility_id").combine_chunks().take(pa.array(visit_encounter)),
+        )
+        tables["patient_visit"] = patient_visit
+
+        visit_ids = patient_visit.column("id").combine_chunks()
+        tables["comprehensive_encounter_map"] = generate(
+            "comprehensive_encounter_map",
+            ComprehensiveEncounterMapDataClass,
+            len(visit_ids),
+            seed=next(seeds),
+            comprehensive_encounter_id=visit_encounter_ids,
+            patient_visit_id=visit_ids,
+            patient_id=visit_patient_ids,
+        )
+        # patient_visit_details extends patient_visit one to one and shares its id
+        tables["patient_visit_details"] = generate(
+            "patient_visit_details", PatientVisitDetailsDataClass, len(visit_ids), seed=next(seeds), id=visit_ids
+        )
+
+        diagnosis_visit, diagnosis_visit_ids = _children(visit_ids, diagnoses_per_visit.counts(len(visit_ids), rng))
+        tables["patient_diagnosis"] = generate(
+            "patient_diagnosis",
+            PatientDiagnosisDataClass,
+            len(diagnosis_visit),
+            seed=next(seeds),
+            patient_visit_id=diagnosis_visit_ids,
+            patient_id=visit_patient_ids.take(pa.array(diagnosis_visit)),
+        )
+        provider_visit, provider_visit_ids = _children(visit_ids, care_providers_per_visit.counts(len(visit_ids), rng))
+        tables["patient_visit_pds_care_provider"] = generate(
+            "patient_visit_pds_care_provider",
+            PatientVisitPDSCareProviderDataClass,
+            len(provider_visit),
+            seed=next(seeds),
+            patient_visit_id=provider_visit_ids,
+        )
+        yield tables
+
+
+def write_schema(output_dir:str, config:Optional[SchemaConfig]=None, seed:int=0) -> Dict[str, str]:
+    """Writes every table to `{output_dir}/{table}.parquet`, one row group per batch. Returns table -> path."""
+    os.makedirs(output_dir, exist_ok=True)
+    writers = {}
+    try:
+        for tables in generate_schema(config, seed):
+            for table_name, table in tables.items():
+                if table.num_rows == 0:
+                    continue
+                if table_name not in writers:
+                    writers[table_name] = pq.ParquetWriter(os.path.join(output_dir, f"{table_name}.parquet"), table.schema)
+                writer = writers[table_name]
+                writer.write_table(table.cast(writer.schema), row_group_size=table.num_rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {table_name: os.path.join(output_dir, f"{table_name}.parquet") for table_name in writers}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic patient/encounter schema with consistent keys.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--facilities", type=int, default=SchemaConfig.facilities)
+    parser.add_argument("--patients", type=int, default=SchemaConfig.patients)
+    parser.add_argument("--facility-skew", type=float, default=SchemaConfig.facility_skew)
+    parser.add_argument("--key-format", choices=KEY_FORMATS, default="uuid")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_schema(
+        args.output_dir,
+        SchemaConfig(facilities=args.facilities, patients=args.patients, facility_skew=args.facility_skew, key_format=args.key_format),
+        seed=args.seed,
+    )
+    for table_name, path in paths.items():
+        print(f"{table_name}: {path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
@@ -0,0 +1,15 @@
+import pytest
+from synthetic_data import DataGenClasses
+from synthetic_data.DataGenClasses import DataClassDF
+
+DATA_CLASSES = [
+    value for value in vars(DataGenClasses).values()
+    if isinstance(value, type) and issubclass(value, DataClassDF) and value is not DataClassDF
+]
+
+
+@pytest.mark.parametrize("data_class", DATA_CLASSES, ids=lambda data_class: data_class.__name__)
+def test_generate_zero_rows(data_class):
+    table = data_class.generate(0, seed=0)
+    assert table.num_rows == 0
+    assert table.column_names == data_class.generate(1, seed=0).column_names
@@ -0,0 +1,41 @@
+from datetime import date
+import pyarrow.parquet as pq
+from synthetic_data.DataGenClasses import ComprehensiveEncounterDataClass
+from synthetic_data.parquet_gen import generate_batches, write_parquet, write_sharded
+
+AS_OF = date(2023, 2, 1)
+
+
+def _single_process(path, n_rows, row_group_size, as_of):
+    write_parquet(generate_batches(ComprehensiveEncounterDataClass, n_rows, row_group_size, seed=7, as_of=as_of), path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_single_shard_is_byte_identical_to_single_process(tmp_path):
+    expected = _single_process(tmp_path / "single.parquet", 2_500, 1_000, AS_OF)
+    [shard] = write_sharded(
+        ComprehensiveEncounterDataClass, 2_500, str(tmp_path / "sharded"), seed=7,
+        rows_per_shard=3_000, row_group_size=1_000, max_workers=1, as_of=AS_OF,
+    )
+    with open(shard, "rb") as f:
+        assert f.read() == expected
+
+
+def test_shards_match_single_process_for_any_worker_count(tmp_path):
+    _single_process(tmp_path / "single.parquet", 5_000, 1_000, AS_OF)
+    expected = pq.read_table(tmp_path / "single.parquet")
+    for workers in (1, 3):
+        paths = write_sharded(
+            ComprehensiveEncounterDataClass, 5_000, str(tmp_path / f"sharded_{workers}"), seed=7,
+            rows_per_shard=2_000, row_group_size=1_000, max_workers=workers, as_of=AS_OF,
+        )
+        assert pq.ParquetDataset(paths).read().equals(expected)
+
+
+def test_as_of_anchors_generated_dates(tmp_path):
+    [shard] = write_sharded(
+        ComprehensiveEncounterDataClass, 1_000, str(tmp_path), seed=7, rows_per_shard=1_000, row_group_size=1_000, as_of=AS_OF,
+    )
+    created_on = pq.read_table(shard, columns=["created_on"]).column("created_on").to_pylist()
+    assert all(date(2023, 1, 2) <= day <= date(2023, 1, 31) for day in created_on)